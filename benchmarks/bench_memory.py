@@ -0,0 +1,125 @@
+'''bench_memory.py: Measure the memory used to load a large repository and
+manifest.
+
+Usage:
+    python benchmarks/bench_memory.py [--families N] [--variants N]
+
+Each measurement runs in a fresh subprocess so that the peak RSS of one does
+not hide the other. Run this script before and after a change to compare.
+'''
+import os
+import sys
+import json
+import argparse
+import resource
+import subprocess
+import tempfile
+import tracemalloc
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+VARIANTS = ['100', '100i', '200', '200i', '300', '300i', '400', '400i', '500', '500i',
+            '600', '600i', '700', '700i', '800', '800i', '900', '900i']
+
+
+def generate_repository(path: str, families: int, variants: int) -> None:
+    '''Write a synthetic `fonty_json_schema_v1` repository file.'''
+    typefaces = []
+    for i in range(families):
+        name = 'Benchmark Family {}'.format(i)
+        typefaces.append({
+            'name': name,
+            'category': 'sans-serif',
+            'fonts': {
+                variant: {
+                    'url': 'https://fonts.example.com/{}/{}-{}.ttf'.format(i, i, variant),
+                    'filename': 'BenchmarkFamily{}-{}.ttf'.format(i, variant)
+                } for variant in VARIANTS[:variants]
+            }
+        })
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'name': 'Benchmark Repository',
+            'schema_identifier': 'fonty_json_schema_v1',
+            'typefaces': typefaces
+        }, f)
+
+
+def generate_manifest(path: str, families: int, variants: int) -> None:
+    '''Write a synthetic manifest file.'''
+    font_families = [{
+        'name': 'Benchmark Family {}'.format(i),
+        'fonts': [{
+            'variant': variant,
+            'local_path': '/Library/Fonts/BenchmarkFamily{}-{}.ttf'.format(i, variant)
+        } for variant in VARIANTS[:variants]]
+    } for i in range(families)]
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'schema_version': '0.1.0',
+            'last_modified': '2018-01-01T00:00:00',
+            'font_count': families * variants,
+            'font_families': font_families
+        }, f)
+
+
+def measure(kind: str, path: str) -> None:
+    '''Load a repository or manifest and print its memory usage. Runs in a subprocess.'''
+    from fonty.models.repository import Repository
+    from fonty.models.manifest import Manifest
+
+    tracemalloc.start()
+    if kind == 'repository':
+        obj = Repository.load_from_path(path)
+        count = len(obj.families)
+    else:
+        try:
+            obj = Manifest.load_from_path(path, lazy=False)
+        except TypeError: # Manifests without lazy loading
+            obj = Manifest.load_from_path(path)
+        count = len(obj.families)
+    _, peak = tracemalloc.get_traced_memory()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    rss = rss / 1024 if sys.platform != 'darwin' else rss / 1024 / 1024
+
+    print(json.dumps({'families': count, 'retained_mb': current / 1024 / 1024,
+                      'peak_mb': peak / 1024 / 1024, 'peak_rss_mb': rss}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--families', type=int, default=20000)
+    parser.add_argument('--variants', type=int, default=8)
+    parser.add_argument('--measure', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        repo_path = os.path.join(tmp_dir, 'repo.json')
+        manifest_path = os.path.join(tmp_dir, 'manifest.json')
+        generate_repository(repo_path, args.families, args.variants)
+        generate_manifest(manifest_path, args.families, args.variants)
+
+        print('{} families x {} variants'.format(args.families, args.variants))
+        for kind, path in (('repository', repo_path), ('manifest', manifest_path)):
+            output = subprocess.check_output(
+                [sys.executable, os.path.abspath(__file__), '--measure', kind, path],
+                env=dict(os.environ, XDG_DATA_HOME=tmp_dir)
+            )
+            result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+            print('  {:<10} retained {:7.1f}MB  traced peak {:7.1f}MB  peak RSS {:7.1f}MB'.format(
+                kind, result['retained_mb'], result['peak_mb'], result['peak_rss_mb']))
+
+
+if __name__ == '__main__':
+    main()
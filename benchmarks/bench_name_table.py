@@ -0,0 +1,129 @@
+'''bench_name_table.py: Benchmark fonty's name table reader against a full
+fontTools parse.
+
+Usage:
+    python benchmarks/bench_name_table.py [FONT_DIR] [--count N]
+
+If no font directory is given, a directory of synthetic fonts is generated in
+a temporary location.
+'''
+import os
+import sys
+import codecs
+import argparse
+import tempfile
+import timeit
+
+from fontTools.ttLib import TTFont, TTLibError
+from fontTools.fontBuilder import FontBuilder
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from fonty.lib.name_table import read_family_and_variant # pylint: disable=C0413
+
+
+def full_parse(path: str):
+    '''The previous `parse_fonts` implementation: decode every name record.'''
+    try:
+        font = TTFont(file=path)
+    except TTLibError:
+        return None, None
+    family = None
+    variant = None
+    for record in font['name'].names:
+        if b'\x00' in record.string:
+            data = record.string.decode('utf-16-be')
+        else:
+            data = codecs.decode(record.string, errors='ignore')
+
+        if record.nameID == 1 and family is None:
+            family = data
+        elif record.nameID == 16:
+            family = data
+        elif record.nameID == 2 and variant is None:
+            variant = data
+        elif record.nameID == 17:
+            variant = data
+    return family, variant
+
+
+def fast_parse(path: str):
+    '''The name-table-only reader.'''
+    try:
+        return read_family_and_variant(path)
+    except TTLibError:
+        return None, None
+
+
+def generate_fonts(path: str, count: int) -> None:
+    '''Generate `count` small TrueType fonts with realistic name tables.'''
+    for i in range(count):
+        builder = FontBuilder(1000, isTTF=True)
+        builder.setupGlyphOrder(['.notdef'])
+        builder.setupCharacterMap({})
+        builder.setupGlyf({'.notdef': _empty_glyph()})
+        builder.setupHorizontalMetrics({'.notdef': (500, 0)})
+        builder.setupHorizontalHeader(ascent=800, descent=-200)
+        names = {
+            'familyName': 'Bench Family {}'.format(i // 8),
+            'styleName': 'Bold Italic',
+            'typographicFamily': 'Bench Family {}'.format(i // 8),
+            'typographicSubfamily': 'Bold Italic',
+            'copyright': 'Copyright (c) fonty benchmarks. ' * 8,
+            'description': 'A synthetic font used to benchmark fonty. ' * 20,
+            'licenseDescription': 'Licensed under the Apache License 2.0. ' * 40,
+        }
+        # Add localized names to approximate the size of real name tables
+        builder.setupNameTable({
+            key: {lang: value for lang in ('en', 'de', 'fr', 'es', 'it', 'nl', 'ja', 'ko')}
+            for key, value in names.items()
+        })
+        builder.setupOS2()
+        builder.setupPost()
+        builder.save(os.path.join(path, 'font-{}.ttf'.format(i)))
+
+
+def _empty_glyph():
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+    return TTGlyphPen(None).glyph()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('font_dir', nargs='?')
+    parser.add_argument('--count', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    tmp_dir = None
+    font_dir = args.font_dir
+    if not font_dir:
+        tmp_dir = tempfile.TemporaryDirectory()
+        font_dir = tmp_dir.name
+        generate_fonts(font_dir, args.count)
+
+    paths = [os.path.join(font_dir, f) for f in sorted(os.listdir(font_dir))
+             if os.path.isfile(os.path.join(font_dir, f)) and not f.startswith('.')]
+
+    # Sanity check: both readers must agree
+    mismatches = [p for p in paths if full_parse(p) != fast_parse(p)]
+
+    results = {}
+    for name, fn in (('fontTools full parse', full_parse), ('name table reader', fast_parse)):
+        timings = timeit.repeat(lambda fn=fn: [fn(p) for p in paths], number=1, repeat=args.repeat)
+        results[name] = min(timings)
+
+    print('{} font files in {}'.format(len(paths), font_dir))
+    for name, seconds in results.items():
+        print('  {:<22} {:8.3f}s  ({:.3f}ms/font)'.format(
+            name, seconds, seconds * 1000 / max(len(paths), 1)))
+    print('  speedup: {:.1f}x'.format(
+        results['fontTools full parse'] / results['name table reader']))
+    if mismatches:
+        print('  WARNING: {} file(s) parsed differently'.format(len(mismatches)))
+
+    if tmp_dir:
+        tmp_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+'''fonty.commands.cache.py: Command-line interface to manage the download cache.'''
+import timeit
+
+import click
+from termcolor import colored
+from fonty.lib import download_cache
+from fonty.lib.download_cache import DownloadCache
+from fonty.lib.task import Task, TaskStatus
+from fonty.lib.constants import COLOR_INPUT, DOWNLOAD_CACHE_DIR
+from fonty.lib.telemetry import TelemetryEvent, TelemetryEventTypes
+
+
+@click.group('cache', short_help='Manage the download cache')
+def cli_cache():
+    '''Manage the download cache.
+
+    Downloaded font files are kept in the download cache, so that installing
+    them again does not download them again.
+    '''
+    pass
+
+
+@cli_cache.command(short_help='Show the size of the download cache')
+def stats():
+    '''Show the number of files and total size of the download cache.'''
+    start_time = timeit.default_timer()
+
+    with download_cache.LOCK:
+        cache_stats = DownloadCache.load().stats()
+
+    if download_cache.is_enabled():
+        size = '{} / {}MB'.format(to_mb(cache_stats.size), to_mb(cache_stats.max_size))
+    else:
+        size = '{}MB (disabled)'.format(to_mb(cache_stats.size))
+
+    click.echo('Files:    {}'.format(colored(cache_stats.count, COLOR_INPUT)))
+    click.echo('Size:     {}'.format(colored(size, COLOR_INPUT)))
+    click.echo('Location: {}'.format(DOWNLOAD_CACHE_DIR))
+
+    # Calculate execution time
+    end_time = timeit.default_timer()
+    total_time = round(end_time - start_time, 2)
+
+    # Send telemetry
+    TelemetryEvent(
+        status_code=0,
+        event_type=TelemetryEventTypes.CACHE_STATS,
+        execution_time=total_time
+    ).send()
+
+
+@cli_cache.command(short_help='Remove the least recently used files')
+@click.option(
+    '--max-size', '-s',
+    type=click.INT,
+    default=None,
+    help='Remove files until the cache is no larger than this size (in MB).')
+def prune(max_size):
+    '''Remove missing and untracked files from the download cache, and then
+    the least recently used files until the cache is no larger than its
+    maximum size.'''
+    start_time = timeit.default_timer()
+
+    if max_size is None:
+        max_size = download_cache.get_max_size()
+    else:
+        max_size = max(max_size, 0) * 1000 * 1000
+
+    task = Task('Pruning the download cache...')
+    with download_cache.LOCK:
+        cache = DownloadCache.load()
+        count, size = cache.prune(max_size)
+        cache.save()
+    task.complete('Removed {} file(s) ({}MB)'.format(
+        colored(count, COLOR_INPUT), to_mb(size)
+    ))
+
+    # Calculate execution time
+    end_time = timeit.default_timer()
+    total_time = round(end_time - start_time, 2)
+
+    # Send telemetry
+    TelemetryEvent(
+        status_code=0,
+        event_type=TelemetryEventTypes.CACHE_PRUNE,
+        execution_time=total_time
+    ).send()
+
+
+@cli_cache.command(short_help='Remove all files')
+def clear():
+    '''Remove all files from the download cache.'''
+    start_time = timeit.default_timer()
+
+    task = Task('Clearing the download cache...')
+    with download_cache.LOCK:
+        cache = DownloadCache.load()
+        count, size = cache.clear()
+        cache.save()
+
+    if count:
+        task.complete('Removed {} file(s) ({}MB)'.format(
+            colored(count, COLOR_INPUT), to_mb(size)
+        ))
+    else:
+        task.stop(status=TaskStatus.WARNING, message='The download cache is already empty')
+
+    # Calculate execution time
+    end_time = timeit.default_timer()
+    total_time = round(end_time - start_time, 2)
+
+    # Send telemetry
+    TelemetryEvent(
+        status_code=0,
+        event_type=TelemetryEventTypes.CACHE_CLEAR,
+        execution_time=total_time
+    ).send()
+
+
+def to_mb(size: int) -> float:
+    '''Convert a size in bytes to MB.'''
+    return round(size / 1000 / 1000, 2)
@@ -3,8 +3,9 @@ import os
 import re
 import timeit
 import sys
+import threading
 from urllib.parse import urlparse
-from typing import List, Tuple
+from typing import List, Tuple, Dict
 
 import click
 from termcolor import colored
@@ -14,9 +15,11 @@ from fonty.lib.task import Task, TaskStatus
 from fonty.lib.progress import ProgressBar
 from fonty.lib.constants import COLOR_INPUT
 from fonty.lib.install import install_fonts
+from fonty.lib.download import load_fonts, get_unique_fonts, Failure
 from fonty.lib.telemetry import TelemetryEvent, TelemetryEventTypes
 from fonty.models.subscription import Subscription
 from fonty.models.font import FontFamily, RemoteFont
+from fonty.models.font.remote_font import FontIntegrityError, get_total_size
 from fonty.models.manifest import Manifest
 
 @click.command('install', short_help='Install a font')
@@ -70,7 +73,7 @@ def cli_install(ctx, args, output, variants, is_files):
     # Process arguments and options
     if variants:
         variants = (','.join(str(x) for x in variants)).split(',')
-        variants = [FontAttribute.parse(variant) for variant in variants]
+        variants = FontAttribute.parse_many(variants)
 
     if not args:
         click.echo(ctx.get_help())
@@ -127,10 +130,25 @@ def cli_install(ctx, args, output, variants, is_files):
             if font.variant is None or font.variant in variants
         ]
 
-    # Load fonts
-    task = Task("Resolving ({}) font files...".format(len(remote_fonts)))
+    # Load fonts. If the repository lists the size of every font file, the
+    # total download size is known in advance.
+    unique_fonts = get_unique_fonts(remote_fonts)
+    sizes = [font.size for font in unique_fonts]
+    if sizes and None not in sizes:
+        task = Task("Resolving ({}) font files ({}kB)...".format(
+            len(unique_fonts), round(sum(sizes) / 1000, 2)
+        ))
+    else:
+        task = Task("Resolving ({}) font files...".format(len(unique_fonts)))
     task_printer = create_task_printer(task, remote_fonts)
-    local_fonts = [font.load(handler=task_printer) for font in remote_fonts]
+    local_fonts, failures = load_fonts(remote_fonts, handler=task_printer)
+
+    # Downloaded and partially downloaded files are kept on failure, so that
+    # running the command again only downloads what is missing
+    if failures:
+        task.error("Failed to resolve ({}) font file(s)".format(len(failures)))
+        print_failures(failures)
+        sys.exit(1)
     task.complete("Resolved ({}) font file(s)".format(len(local_fonts)))
 
     # Filter out variants again
@@ -151,16 +169,10 @@ def cli_install(ctx, args, output, variants, is_files):
 
     # Update the font manifest
     if not output:
-        manifest = Manifest.load()
-        for font in installed_fonts:
-            manifest.add(font)
-        manifest.save()
-
-        # Check for manifest staleness
-        if manifest.is_stale():
-            task.message = 'Rebuilding font manifest...'
-            manifest = Manifest.generate()
-            manifest.save()
+        task.message = 'Updating font manifest...'
+        with Manifest.load().transaction() as manifest:
+            for font in installed_fonts:
+                manifest.add(font)
 
     # Done!
     message = "Installed '{}'".format(colored(', '.join([f.name for f in installed_families]), COLOR_INPUT))
@@ -196,75 +208,101 @@ def cli_install(ctx, args, output, variants, is_files):
 
 
 def create_task_printer(task: Task, remote_fonts: List[RemoteFont]):
-    '''Create a download/load handler that prints its progress to as Task instance.'''
+    '''Create a download/load handler that prints the combined progress of
+    all fonts to a Task instance. The handler can be shared by fonts that are
+    loaded concurrently.
+    '''
 
+    # Fonts that share a path are only loaded once
+    unique_fonts = get_unique_fonts(remote_fonts)
+
+    lock = threading.Lock()
+    total_count = len(unique_fonts)
     loaded_count = 0
 
-    def load_handler(font: RemoteFont, meta):
-        '''Generator function that is advanced when the font downloading/loading progresses.'''
+    # The total and received bytes of each font. The sizes of fonts that are
+    # not known in advance are known once their download starts.
+    sizes: Dict[RemoteFont, int] = {font: font.size for font in unique_fonts if font.size}
+    received: Dict[RemoteFont, int] = {}
+    unknown_sizes = set()
+
+    def print_progress(action: str):
+        '''Print the combined progress of all fonts.'''
 
         # Create a total loaded fonts counter. eg. (3/12) fonts downloaded
-        nonlocal loaded_count
-        loaded_count += 1
         loaded_fonts_str = colored('({count}/{total})'.format(
             count=loaded_count,
-            total=len(remote_fonts)
+            total=total_count
         ), attrs=['dark'])
+        message = '{count} {action} font files... '.format(count=loaded_fonts_str, action=action)
+
+        # Only draw a progress bar if the size of every download is known
+        received_size = sum(received.values())
+        if sizes and not unknown_sizes:
+            bar = ProgressBar(total=sum(sizes.values()), desc=message)
+            bar.update(received_size)
+            task.message = str(bar)
+        elif received:
+            task.message = message + '{}kB'.format(round(received_size / 1000, 2))
+        else:
+            task.message = message
+
+    def load_handler(font: RemoteFont, meta):
+        '''Generator function that is advanced when the font downloading/loading progresses.'''
+        nonlocal loaded_count
 
         # Handle HTTP remotes
         if font.remote_path.type == RemoteFont.Path.Type.HTTP_REMOTE:
-            total_size: str = meta.headers.get('Content-Length', None)
-
-            # Create progress bar
-            bar = None
-            if total_size:
-                bar = ProgressBar(
-                    total=int(total_size),
-                    desc='{count} Downloading {filename}... '.format(
-                        count=loaded_fonts_str,
-                        filename=font.filename
-                    )
-                )
+            # `meta` is `None` if the font was downloaded by a previous run
+            total_size = (get_total_size(meta) if meta else None) or font.size
+            with lock:
+                if total_size:
+                    sizes[font] = int(total_size)
+                else:
+                    unknown_sizes.add(font)
+                received[font] = 0
 
             try:
                 while True:
                     current_size = yield
-                    if bar:
-                        bar.update(current_size)
-                        task.message = str(bar)
-                    else:
-                        task.message = '{count} Downloading {filename}... {size}kB'.format(
-                            count=loaded_fonts_str,
-                            filename=font.filename,
-                            size=round(current_size / 1000, 2)
-                        )
+                    with lock:
+                        received[font] = current_size
+                        print_progress('Downloading')
             except GeneratorExit:
-                if bar:
-                    bar.update(bar.total)
-                    task.message = str(bar)
-                else:
-                    task.message = '{count} Downloading {filename}... DONE'.format(
-                        count=loaded_fonts_str,
-                        filename=font.filename
-                    )
+                with lock:
+                    loaded_count += 1
+                    unknown_sizes.discard(font)
+                    sizes[font] = received[font]
+                    print_progress('Downloading')
 
         # Handle local files
         elif font.remote_path.type == RemoteFont.Path.Type.LOCAL:
             try:
                 while True:
-                    task.message = '{count} Loading {filename}...'.format(
-                        count=loaded_fonts_str,
-                        filename=font.filename
-                    )
+                    with lock:
+                        print_progress('Loading')
                     yield
             except GeneratorExit:
-                task.message = '{count} Loaded {filename}'.format(
-                    count=loaded_fonts_str,
-                    filename=font.filename
-                )
+                with lock:
+                    loaded_count += 1
+                    print_progress('Loading')
 
     return load_handler
 
+def print_failures(failures: List[Failure]) -> None:
+    '''Print the fonts that failed to load, and why.'''
+    for font, e in failures:
+        if isinstance(e, FontIntegrityError):
+            reason = 'Failed to verify font file: {}'.format(e)
+        else:
+            reason = str(e) or type(e).__name__
+        Task(
+            "{}: {}".format(font.filename or font.remote_path.filename, reason),
+            status=TaskStatus.ERROR,
+            asynchronous=False,
+            truncate=False
+        )
+
 def resolve_download(arg, print_task: bool = True) -> Tuple[List[RemoteFont], str]:
     '''Resolve if provided argument is a font name or a HTTP download link.'''
     font_source: str = ''
@@ -298,8 +336,10 @@ def resolve_download(arg, print_task: bool = True) -> Tuple[List[RemoteFont], st
 
             # Print no results message
             task.error("No results found for '{}'".format(colored(arg, COLOR_INPUT)))
-            if e.suggestion:
-                click.echo("Did you mean '{}'".format(e.suggestion))
+            if e.suggestions:
+                click.echo("Did you mean {}?".format(
+                    ', '.join("'{}'".format(suggestion) for suggestion in e.suggestions)
+                ))
 
             raise e
 
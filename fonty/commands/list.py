@@ -75,13 +75,14 @@ def cli_list(name: str, rebuild: bool):
         manifest = Manifest.generate()
         manifest.save()
 
-    # Rebuild manifest.json if the manifest is stale
-    if manifest.is_stale():
-        task = Task('Rebuilding font manifest...')
-        manifest = Manifest.generate()
+    # Update manifest.json if the installed fonts have changed
+    changes = manifest.get_changes()
+    if changes:
+        task = Task('Updating font manifest...')
+        manifest.update(changes)
         manifest.save()
-        task.complete('Rebuilt font manifest with {count} font families found.'.format(
-            count=len(manifest.families)
+        task.complete('Updated font manifest with {count} font families found.'.format(
+            count=len(manifest.summary())
         ))
 
     # List all installed fonts if no font family name is specified
@@ -107,9 +108,9 @@ def list_all_fonts(manifest: Manifest):
 
     # Get font list
     entries = ['{name} {variants}'.format(
-        name=family.name,
-        variants=colored('({})'.format(len(family.get_variants())), attrs=['dark'])
-    ) for family in manifest.families]
+        name=name,
+        variants=colored('({})'.format(count), attrs=['dark'])
+    ) for name, count in manifest.summary()]
     entries.sort()
 
     # Find the optimal column count. How it works:
@@ -0,0 +1,82 @@
+'''fonty.commands.search.py: Command-line interface to search for fonts in sources.'''
+import sys
+import timeit
+
+import click
+from termcolor import colored
+from fonty.lib import search
+from fonty.lib.constants import COLOR_INPUT
+from fonty.models.subscription import Subscription
+from fonty.lib.telemetry import TelemetryEvent, TelemetryEventTypes
+
+#: The default number of search results to list.
+DEFAULT_RESULT_COUNT = 10
+
+@click.command('search', short_help='Search for fonts in sources')
+@click.argument(
+    'query',
+    nargs=-1,
+    required=True,
+    type=click.STRING)
+@click.option(
+    '--limit', '-n',
+    type=click.IntRange(min=1),
+    default=DEFAULT_RESULT_COUNT,
+    show_default=True,
+    help='Maximum number of results to list.')
+def cli_search(query: str, limit: int):
+    '''Search for font families in all subscribed sources.
+
+    Results are ranked by how closely their names match the query, so
+    misspelled names still find the right font family.
+
+    \b
+    Example usage:
+    ==============
+
+    \b
+      Basic usage:
+      >>> fonty search "Open Sans"
+
+    \b
+      List the 20 closest matches:
+      >>> fonty search "open sns" -n 20
+    '''
+
+    start_time = timeit.default_timer()
+
+    # Process arguments
+    query = ' '.join(str(x) for x in query)
+
+    results = search.get_suggestions(query, limit=limit)
+    if not results:
+        click.echo("No results found for '{}'".format(colored(query, COLOR_INPUT)))
+    else:
+        source_names = {sub.local_path: sub.name for sub in Subscription.load_entries()}
+        width = max(len(result.name) for result in results)
+        for idx, result in enumerate(results):
+            sources = ', '.join(
+                source_names.get(path, path) for path in result.repository_paths
+            )
+            click.echo('{count:>{count_width}}. {name:{width}}  {sources}'.format(
+                count=idx + 1,
+                count_width=len(str(len(results))),
+                name=result.name,
+                width=width,
+                sources=colored(sources, attrs=['dark'])
+            ))
+
+    # Calculate execution time
+    end_time = timeit.default_timer()
+    total_time = round(end_time - start_time, 2)
+
+    # Send telemetry
+    TelemetryEvent(
+        status_code=0 if results else 1,
+        event_type=TelemetryEventTypes.FONT_SEARCH,
+        execution_time=total_time,
+        data={'font_name': query}
+    ).send()
+
+    if not results:
+        sys.exit(1)
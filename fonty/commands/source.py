@@ -1,17 +1,21 @@
 '''fonty.commands.source.py: Command-line interface to manage sources.'''
-import shutil
+import os
 import sys
 import time
 import timeit
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import click
 from termcolor import colored
 from fonty.lib import search
-from fonty.lib.task import Task
-from fonty.lib.constants import COLOR_INPUT, SEARCH_INDEX_PATH
+from fonty.lib.task import Task, TaskStatus
+from fonty.lib.constants import COLOR_INPUT
 from fonty.models.subscription import Subscription
 from fonty.lib.telemetry import TelemetryEvent, TelemetryEventTypes
 
+#: The default number of sources fetched at the same time by `source update`.
+DEFAULT_UPDATE_JOBS = 4
+
 
 @click.group('source', short_help='Manage font sources')
 def cli_source():
@@ -28,17 +32,17 @@ def add(url):
     # Add to subscription list and fetch remote repository
     task = Task("Loading '{}'...".format(colored(url, COLOR_INPUT)))
     sub = Subscription.load_from_url(url).subscribe()
-    repo = sub.get_local_repository()
+    repo = sub.repo
     task.complete("Loaded '{}'".format(colored(repo.name, COLOR_INPUT)))
 
     # Index fonts
     task = Task("Indexing {count} font families in '{repo}'".format(
-        count=len(repo.families),
+        count=repo.family_count,
         repo=colored(repo.name, COLOR_INPUT)
     ))
     search.index_fonts(repo, sub.local_path)
     task.complete("Indexed {count} new font families".format(
-        count=colored(len(repo.families), COLOR_INPUT)
+        count=colored(repo.family_count, COLOR_INPUT)
     ))
 
     print('')
@@ -143,35 +147,85 @@ def list_():
     '--force', '-f',
     is_flag=True,
     help='Force all sources to update.')
-def update(force: bool):
+@click.option(
+    '--jobs', '-j',
+    type=click.IntRange(min=1),
+    default=DEFAULT_UPDATE_JOBS,
+    show_default=True,
+    help='Number of sources to fetch at the same time.')
+def update(force: bool, jobs: int):
     '''Check sources for updates.'''
     start_time = timeit.default_timer()
 
-    # Delete search index directory if `force` flag is True
-    if force:
-        shutil.rmtree(SEARCH_INDEX_PATH)
-
     subscriptions = Subscription.load_entries()
 
     if not subscriptions:
         click.echo('No sources to update')
 
-    for sub in subscriptions:
-        name = colored(sub.get_local_repository().name, COLOR_INPUT)
-        task = Task("Updating '{}'".format(name))
-
-        # Fetch remote repositories
-        sub, has_changes = sub.fetch()
-        if not has_changes and not force:
-            task.complete("No updates available for '{}'".format(name))
-            continue
-
-        # Reindex fonts
-        task.message = "Indexing '{}'".format(name)
-        updated_repo = sub.get_local_repository()
-        search.index_fonts(updated_repo, sub.local_path)
-
-        task.complete("Updated '{}'".format(name))
+    # Fetch all remote repositories concurrently, and reindex each one on this
+    # thread as soon as it arrives. A failing source does not stop the others.
+    # If `force` is true, the search index is rebuilt from scratch once all
+    # sources have been fetched instead.
+    results = []
+    if subscriptions:
+        total = len(subscriptions)
+        task = Task("Checking {} source(s) for updates...".format(total))
+
+        with ThreadPoolExecutor(max_workers=min(jobs, total)) as executor:
+            futures = {
+                executor.submit(sub.fetch, save_to_local=True, force=force): sub
+                for sub in subscriptions
+            }
+
+            for count, future in enumerate(as_completed(futures), start=1):
+                sub = futures[future]
+                name = colored(sub.name, COLOR_INPUT)
+                try:
+                    sub, has_changes = future.result()
+                    if force:
+                        results.append((TaskStatus.SUCCESS, "Updated '{}'".format(name)))
+                        continue
+                    if not has_changes:
+                        results.append(
+                            (TaskStatus.SUCCESS, "No updates available for '{}'".format(name))
+                        )
+                        continue
+
+                    # Reindex fonts
+                    task.message = "Indexing '{}' ({}/{})".format(name, count, total)
+                    search.index_fonts(sub.repo, sub.local_path)
+                    results.append((TaskStatus.SUCCESS, "Updated '{}'".format(name)))
+                except Exception as e: # pylint: disable=W0703
+                    results.append((TaskStatus.ERROR, "Failed to update '{}': {}".format(name, e)))
+                finally:
+                    task.message = "Checking {} source(s) for updates ({}/{})...".format(
+                        total, count, total
+                    )
+
+        task.complete("Checked {} source(s) for updates".format(total))
+
+    # Rebuild the search index with every source, including the local copies
+    # of sources that failed to update. Local copies that cannot be loaded
+    # are left out of the index.
+    if subscriptions and force:
+        task = Task("Rebuilding search index...")
+        count, failures = search.rebuild_index(
+            (sub.repo if sub.repo else sub.get_local_repository, sub.local_path)
+            for sub in subscriptions if sub.repo or os.path.isfile(sub.local_path or '')
+        )
+        task.complete("Rebuilt search index with {} font families".format(count))
+
+        names = {sub.local_path: colored(sub.name, COLOR_INPUT) for sub in subscriptions}
+        for path, e in failures:
+            results.append(
+                (TaskStatus.ERROR, "Failed to index '{}': {}".format(names.get(path, path), e))
+            )
+
+    # Print the result of each source
+    for status, message in results:
+        Task(message, status=status, asynchronous=False, truncate=False)
+
+    errors = sum(1 for status, _ in results if status == TaskStatus.ERROR)
 
     # Calculate execution time
     end_time = timeit.default_timer()
@@ -179,7 +233,10 @@ def update(force: bool):
 
     # Send telemetry
     TelemetryEvent(
-        status_code=0,
+        status_code=1 if errors else 0,
         execution_time=total_time,
         event_type=TelemetryEventTypes.SOURCE_UPDATE
     ).send()
+
+    if errors:
+        sys.exit(1)
@@ -46,7 +46,7 @@ def cli_uninstall(ctx, name, variants):
     name = ' '.join(str(x) for x in name)
     if variants:
         variants = (','.join(str(x) for x in variants)).split(',')
-        variants = [FontAttribute.parse(variant) for variant in variants]
+        variants = FontAttribute.parse_many(variants)
 
     if not name:
         click.echo(ctx.get_help())
@@ -78,7 +78,8 @@ def cli_uninstall(ctx, name, variants):
 
     # Check if variants exists
     if variants:
-        invalid_variants = [x for x in variants if x not in family.variants]
+        family_variants = set(family.variants)
+        invalid_variants = [x for x in variants if x not in family_variants]
         if invalid_variants:
             task.error("Variant(s) [{}] not available".format(
                 colored(', '.join([str(v) for v in invalid_variants]), COLOR_INPUT)
@@ -106,16 +107,10 @@ def cli_uninstall(ctx, name, variants):
     uninstalled_families = FontFamily.from_font_list(uninstalled_fonts)
 
     # Update the font manifest
-    manifest = Manifest.load()
-    for font in uninstalled_fonts:
-        manifest.remove(font)
-        manifest.save()
-
-    # Check for manifest staleness
-    if manifest.is_stale():
-        task.message = 'Rebuilding font manifest...'
-        manifest = Manifest.generate()
-        manifest.save()
+    task.message = 'Updating font manifest...'
+    with manifest.transaction():
+        for font in uninstalled_fonts:
+            manifest.remove(font)
 
     # Print success message
     message = "Uninstalled {}".format(
@@ -13,7 +13,8 @@ from fonty.lib.progress import ProgressBar
 from fonty.lib.telemetry import TelemetryEvent, TelemetryEventTypes
 from fonty.models.manifest import Manifest
 from fonty.models.font import Font, FontFormat
-from fonty.commands.install import resolve_download, create_task_printer
+from fonty.lib.download import load_fonts, get_unique_fonts
+from fonty.commands.install import resolve_download, create_task_printer, print_failures
 
 @click.command('webfont', short_help='Generate webfonts')
 @click.argument(
@@ -79,9 +80,13 @@ def cli_webfont(ctx, args: List[str], is_installed: bool, is_download: bool, out
         remote_fonts, font_source = resolve_download(arg, print_task=True)
 
         # Download fonts
-        task = Task("Downloading ({}) font files...".format(len(remote_fonts)))
+        task = Task("Downloading ({}) font files...".format(len(get_unique_fonts(remote_fonts))))
         task_printer = create_task_printer(task, remote_fonts)
-        fonts = [font.load(handler=task_printer) for font in remote_fonts]
+        fonts, failures = load_fonts(remote_fonts, handler=task_printer)
+        if failures:
+            task.error("Failed to download ({}) font file(s)".format(len(failures)))
+            print_failures(failures)
+            sys.exit(1)
         task.complete("Downloaded ({}) font files".format(len(fonts)))
 
     elif is_installed:
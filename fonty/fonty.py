@@ -15,6 +15,8 @@ from fonty.commands.uninstall import cli_uninstall
 from fonty.commands.source import cli_source
 from fonty.commands.list import cli_list
 from fonty.commands.webfont import cli_webfont
+from fonty.commands.search import cli_search
+from fonty.commands.cache import cli_cache
 
 # Enable colored output on Windows
 colorama.init()
@@ -38,6 +40,10 @@ def main(ctx, version: bool):
       Uninstall Open Sans from your computer:
       >>> fonty uninstall "Open Sans"
 
+    \b
+      Search for Open Sans in your sources:
+      >>> fonty search "Open Sans"
+
     \b
       Download and convert Open Sans to webfonts:
       >>> fonty webfont --download "Open Sans"
@@ -72,3 +78,5 @@ main.add_command(cli_uninstall)
 main.add_command(cli_source)
 main.add_command(cli_list)
 main.add_command(cli_webfont)
+main.add_command(cli_search)
+main.add_command(cli_cache)
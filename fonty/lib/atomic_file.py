@@ -0,0 +1,56 @@
+'''fonty.lib.atomic_file: Atomic file writes and versioned JSON files.'''
+import os
+import json
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w', encoding: str = None) -> Iterator[IO]:
+    '''Open a temporary file to write the contents of `path` to.
+
+    The temporary file replaces `path` once it has been written and closed,
+    so readers never see a partially written file. If writing fails, `path`
+    is left as it was. Missing parent directories are created.
+    '''
+    directory = os.path.dirname(path)
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    # Concurrent writers each write their own temporary file
+    tmp_path = '{}.{}-{}.tmp'.format(path, os.getpid(), threading.get_ident())
+    try:
+        with open(tmp_path, mode, encoding=encoding) as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.isfile(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def copy_file(src: str, dst: str) -> None:
+    '''Copy a file to `dst` atomically.'''
+    with open(src, 'rb') as src_file, atomic_write(dst, 'wb') as dst_file:
+        shutil.copyfileobj(src_file, dst_file)
+
+def load_json(path: str, schema_version: int) -> Optional[dict]:
+    '''Load a versioned JSON file. Returns `None` if the file does not exist,
+    cannot be read, or was written with another schema version.
+    '''
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(data, dict) or data.get('schema_version') != schema_version:
+        return None
+
+    return data
+
+def save_json(path: str, schema_version: int, data: dict) -> None:
+    '''Save a versioned JSON file atomically.'''
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        json.dump(dict({'schema_version': schema_version}, **data), f, separators=(',', ':'))
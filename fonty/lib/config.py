@@ -11,6 +11,35 @@ class CommonConfiguration(dict):
     #: Enables telemetry
     telemetry: bool = True
 
+    #: The number of worker processes used to scan installed fonts. A value of
+    #: 0 uses one worker per CPU.
+    scan_workers: int = 0
+
+    #: The number of worker processes used to rebuild the search index. A value
+    #: of 0 uses one worker per CPU.
+    index_workers: int = 1
+
+    #: The number of font files downloaded at the same time.
+    download_workers: int = 8
+
+    #: The maximum size of the download cache in MB. A value of 0 disables it.
+    download_cache_size: int = 500
+
+    #: The number of seconds to wait for a connection to a server.
+    http_connect_timeout: float = 10
+
+    #: The number of seconds to wait for a server to send data.
+    http_read_timeout: float = 30
+
+    #: The number of times a failed request is retried.
+    http_retries: int = 3
+
+    #: Accept compressed responses.
+    http_compression: bool = True
+
+    #: The storage backend of the font manifest. Either `json` or `sqlite`.
+    manifest_backend: str = 'json'
+
 
 def load_config(path: str = os.path.join(APP_DIR, CONFIG_FILENAME)):
     '''Load configuration values from the configuration file.'''
@@ -22,3 +51,30 @@ def load_config(path: str = os.path.join(APP_DIR, CONFIG_FILENAME)):
     # Read `common` configuration values
     if 'common' in config:
         CommonConfiguration.telemetry = config.getboolean('common', 'telemetry')
+        CommonConfiguration.scan_workers = config.getint(
+            'common', 'scan_workers', fallback=CommonConfiguration.scan_workers
+        )
+        CommonConfiguration.index_workers = config.getint(
+            'common', 'index_workers', fallback=CommonConfiguration.index_workers
+        )
+        CommonConfiguration.download_workers = config.getint(
+            'common', 'download_workers', fallback=CommonConfiguration.download_workers
+        )
+        CommonConfiguration.download_cache_size = config.getint(
+            'common', 'download_cache_size', fallback=CommonConfiguration.download_cache_size
+        )
+        CommonConfiguration.http_connect_timeout = config.getfloat(
+            'common', 'http_connect_timeout', fallback=CommonConfiguration.http_connect_timeout
+        )
+        CommonConfiguration.http_read_timeout = config.getfloat(
+            'common', 'http_read_timeout', fallback=CommonConfiguration.http_read_timeout
+        )
+        CommonConfiguration.http_retries = config.getint(
+            'common', 'http_retries', fallback=CommonConfiguration.http_retries
+        )
+        CommonConfiguration.http_compression = config.getboolean(
+            'common', 'http_compression', fallback=CommonConfiguration.http_compression
+        )
+        CommonConfiguration.manifest_backend = config.get(
+            'common', 'manifest_backend', fallback=CommonConfiguration.manifest_backend
+        ).lower()
@@ -13,9 +13,16 @@ APP_DIR = user_data_dir(APP_NAME)
 TMP_DIR = os.path.join(APP_DIR, 'tmp')
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(inspect.stack()[0][1])))
 SEARCH_INDEX_PATH = os.path.join(APP_DIR, 'index')
+SEARCH_NAMES_PATH = os.path.join(SEARCH_INDEX_PATH, 'names.json')
+SEARCH_SUGGESTIONS_PATH = os.path.join(SEARCH_INDEX_PATH, 'suggestions.pickle')
 SUBSCRIPTIONS_PATH = os.path.join(APP_DIR, 'subscriptions.json')
 MANIFEST_PATH = os.path.join(APP_DIR, 'manifest.json')
+MANIFEST_DB_PATH = os.path.join(APP_DIR, 'manifest.db')
+FONT_CACHE_PATH = os.path.join(APP_DIR, 'font_cache.json')
 REPOSITORY_DIR = os.path.join(APP_DIR, 'repositories')
+SNAPSHOT_DIR = os.path.join(APP_DIR, 'snapshots')
+DOWNLOAD_CACHE_DIR = os.path.join(APP_DIR, 'download_cache')
+DOWNLOAD_CACHE_PATH = os.path.join(DOWNLOAD_CACHE_DIR, 'index.json')
 
 # Filenames
 CONFIG_FILENAME = 'fonty.conf'
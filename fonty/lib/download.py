@@ -0,0 +1,60 @@
+'''download.py: Load remote fonts concurrently.'''
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from fonty.lib import network
+from fonty.lib.config import CommonConfiguration
+from fonty.models.font import Font, RemoteFont
+
+#: A remote font that failed to load, and the exception it raised.
+Failure = Tuple[RemoteFont, Exception]
+
+def load_fonts(
+    remote_fonts: List[RemoteFont],
+    handler=None,
+    workers: int = None
+) -> Tuple[List[Font], List[Failure]]:
+    '''Load a list of remote fonts concurrently.
+
+    Fonts that share the same path (e.g. variants that are served from the
+    same file) are only loaded once. At most `workers` fonts are loaded at
+    the same time, and downloads share the connection pool of the shared
+    HTTP session. If `workers` is not provided, the `download_workers`
+    configuration value is used.
+
+    Returns a `(fonts, failures)` tuple, where `fonts` contains a `Font` for
+    each unique path, in the order of `remote_fonts`, and `failures` contains
+    a `(remote_font, exception)` tuple for each font that failed to load. A
+    failing font does not stop the others from loading.
+    '''
+    if workers is None:
+        workers = CommonConfiguration.download_workers
+    workers = max(workers, 1)
+
+    remote_fonts = get_unique_fonts(remote_fonts)
+    if not remote_fonts:
+        return [], []
+
+    session = network.get_session()
+    with ThreadPoolExecutor(max_workers=min(workers, len(remote_fonts))) as executor:
+        futures = [
+            executor.submit(font.load, handler=handler, session=session)
+            for font in remote_fonts
+        ]
+
+    fonts: List[Font] = []
+    failures: List[Failure] = []
+    for remote_font, future in zip(remote_fonts, futures):
+        try:
+            fonts.append(future.result())
+        except Exception as e: # pylint: disable=W0703
+            failures.append((remote_font, e))
+
+    return fonts, failures
+
+def get_unique_fonts(remote_fonts: List[RemoteFont]) -> List[RemoteFont]:
+    '''Returns the first remote font of each unique path.'''
+    unique = {}
+    for font in remote_fonts:
+        unique.setdefault((font.remote_path.type, font.remote_path.path), font)
+    return list(unique.values())
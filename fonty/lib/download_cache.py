@@ -0,0 +1,230 @@
+'''fonty.lib.download_cache: A content-addressed cache of downloaded font files.'''
+import os
+import time
+import threading
+from typing import Dict, List, Optional, Tuple, NamedTuple
+
+from fonty.lib.config import CommonConfiguration
+from fonty.lib.constants import DOWNLOAD_CACHE_DIR, DOWNLOAD_CACHE_PATH
+from fonty.lib import atomic_file
+
+#: Serialises access to the cache index between threads.
+LOCK = threading.RLock()
+
+
+class CacheStats(NamedTuple):
+    '''The number of files and total size of the download cache.'''
+    count: int
+    size: int
+    max_size: int
+
+
+class DownloadCache:
+    '''`DownloadCache` keeps a copy of every downloaded font file, so that
+    fonts do not have to be downloaded again.
+
+    Files are stored by the SHA-256 hash of their contents. Each URL maps to
+    the hash of the file it was last downloaded as, along with the `ETag` and
+    `Last-Modified` validators of the response, so that it can be revalidated
+    with a conditional request. The least recently used files are evicted
+    once the cache grows over its maximum size.
+    '''
+
+    #: The schema version of the cache index file.
+    schema_version: int = 1
+
+    #: The `[size, last_used]` of each cached file, keyed by SHA-256 hash.
+    objects: Dict[str, list]
+
+    #: The `[sha256, etag, last_modified]` of each cached URL.
+    urls: Dict[str, list]
+
+    def __init__(self, objects: Dict[str, list] = None, urls: Dict[str, list] = None) -> None:
+        self.objects = objects if objects is not None else {}
+        self.urls = urls if urls is not None else {}
+
+    @property
+    def size(self) -> int:
+        '''The total size of the cached files, in bytes.'''
+        return sum(size for size, _ in self.objects.values())
+
+    def get(self, sha256: str) -> Optional[str]:
+        '''Returns the path to the cached file with this hash, or `None` if it
+        is not cached.
+        '''
+        if sha256 is None or sha256.lower() not in self.objects:
+            return None
+
+        path = DownloadCache.get_object_path(sha256.lower())
+        if not os.path.isfile(path):
+            del self.objects[sha256.lower()]
+            return None
+
+        self.objects[sha256.lower()][1] = time.time()
+        return path
+
+    def get_url(self, url: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        '''Returns the `(sha256, etag, last_modified)` of the file a URL was
+        last downloaded as, or `None` if it is not cached.
+        '''
+        entry = self.urls.get(url)
+        if entry is None or entry[0] not in self.objects:
+            return None
+        return entry[0], entry[1], entry[2]
+
+    def add(self, path: str, sha256: str, url: str = None, etag: str = None,
+            last_modified: str = None) -> None:
+        '''Add a copy of a downloaded file to the cache.'''
+        sha256 = sha256.lower()
+        object_path = DownloadCache.get_object_path(sha256)
+
+        if not os.path.isfile(object_path):
+            atomic_file.copy_file(path, object_path)
+
+        self.objects[sha256] = [os.path.getsize(object_path), time.time()]
+        if url:
+            self.urls[url] = [sha256, etag, last_modified]
+
+    def evict(self, max_size: int) -> Tuple[int, int]:
+        '''Remove the least recently used files until the cache is no larger
+        than `max_size` bytes. Returns the number and total size of the files
+        that were removed.
+        '''
+        size = self.size
+        removed: List[str] = []
+        for sha256, (object_size, _) in sorted(self.objects.items(), key=lambda x: x[1][1]):
+            if size <= max_size:
+                break
+            size -= object_size
+            removed.append(sha256)
+
+        return len(removed), self.remove(removed)
+
+    def prune(self, max_size: int) -> Tuple[int, int]:
+        '''Remove entries whose files are missing, files that are not in the
+        index, and then the least recently used files until the cache is no
+        larger than `max_size` bytes. Returns the number and total size of the
+        files that were removed.
+        '''
+        count = 0
+        size = 0
+
+        # Remove index entries of missing files
+        for sha256 in list(self.objects):
+            if not os.path.isfile(DownloadCache.get_object_path(sha256)):
+                del self.objects[sha256]
+
+        # Remove files that are not in the index
+        for path in DownloadCache.get_object_paths():
+            if os.path.basename(path) not in self.objects:
+                count += 1
+                size += os.path.getsize(path)
+                os.unlink(path)
+
+        evicted_count, evicted_size = self.evict(max_size)
+        return count + evicted_count, size + evicted_size
+
+    def clear(self) -> Tuple[int, int]:
+        '''Remove all cached files. Returns the number and total size of the
+        files that were removed.
+        '''
+        return self.prune(0)
+
+    def remove(self, sha256s: List[str]) -> int:
+        '''Remove cached files by hash. Returns the total size of the files
+        that were removed.
+        '''
+        size = 0
+        sha256s = set(sha256s)
+        for sha256 in sha256s:
+            object_size, _ = self.objects.pop(sha256, (0, None))
+            path = DownloadCache.get_object_path(sha256)
+            if os.path.isfile(path):
+                os.unlink(path)
+                size += object_size
+
+        self.urls = {url: entry for url, entry in self.urls.items() if entry[0] not in sha256s}
+        return size
+
+    def stats(self) -> CacheStats:
+        '''Returns the number of files and total size of the cache.'''
+        return CacheStats(count=len(self.objects), size=self.size, max_size=get_max_size())
+
+    def save(self, path: str = None) -> None:
+        '''Save the cache index to disk.'''
+        path = path if path else DOWNLOAD_CACHE_PATH
+        atomic_file.save_json(path, self.schema_version, {'objects': self.objects, 'urls': self.urls})
+
+    @staticmethod
+    def get_object_path(sha256: str) -> str:
+        '''Returns the path to the cached file with this hash.'''
+        return os.path.join(DOWNLOAD_CACHE_DIR, 'objects', sha256[:2], sha256)
+
+    @staticmethod
+    def get_object_paths() -> List[str]:
+        '''Returns the paths to all files in the cache directory.'''
+        paths = []
+        for root, _, filenames in os.walk(os.path.join(DOWNLOAD_CACHE_DIR, 'objects')):
+            paths.extend(os.path.join(root, filename) for filename in filenames)
+        return paths
+
+    @staticmethod
+    def load(path: str = None) -> 'DownloadCache':
+        '''Load the cache index from disk. Returns an empty cache if the index
+        file does not exist or cannot be read.
+        '''
+        path = path if path else DOWNLOAD_CACHE_PATH
+
+        data = atomic_file.load_json(path, DownloadCache.schema_version)
+        if data is None:
+            return DownloadCache()
+
+        return DownloadCache(objects=data.get('objects', {}), urls=data.get('urls', {}))
+
+
+def find(sha256: str) -> Optional[str]:
+    '''Returns the path to the cached file with this hash, and marks it as
+    recently used. Returns `None` if it is not cached.
+    '''
+    if not is_enabled() or sha256 is None:
+        return None
+
+    with LOCK:
+        cache = DownloadCache.load()
+        path = cache.get(sha256)
+        cache.save()
+    return path
+
+def find_url(url: str) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+    '''Returns the `(sha256, etag, last_modified)` of the cached file a URL
+    was last downloaded as, or `None` if it is not cached.
+    '''
+    if not is_enabled():
+        return None
+
+    with LOCK:
+        return DownloadCache.load().get_url(url)
+
+def store(path: str, sha256: str, url: str = None, etag: str = None,
+          last_modified: str = None) -> None:
+    '''Add a downloaded file to the cache, and evict the least recently used
+    files if the cache is over its maximum size.
+    '''
+    if not is_enabled():
+        return
+
+    with LOCK:
+        cache = DownloadCache.load()
+        cache.add(path, sha256, url=url, etag=etag, last_modified=last_modified)
+        cache.evict(get_max_size())
+        cache.save()
+
+def get_max_size() -> int:
+    '''Returns the maximum size of the download cache in bytes, from the
+    `download_cache_size` configuration value. The cache is disabled if it is 0.
+    '''
+    return max(CommonConfiguration.download_cache_size, 0) * 1000 * 1000
+
+def is_enabled() -> bool:
+    '''Returns `true` if downloaded files are cached.'''
+    return get_max_size() > 0
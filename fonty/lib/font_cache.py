@@ -0,0 +1,104 @@
+'''fonty.lib.font_cache: A persistent cache of parsed font file metadata.'''
+import os
+from typing import Dict, List, Optional, Iterable, NamedTuple
+
+from fonty.lib.constants import FONT_CACHE_PATH
+from fonty.lib import atomic_file
+
+class FontChanges(NamedTuple):
+    '''The font files that were added, modified or removed from a directory.'''
+    added: List[str]
+    modified: List[str]
+    removed: List[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+
+class FontCache:
+    '''`FontCache` remembers the family and variant names of font files so that
+    unchanged files do not have to be parsed again when the manifest is rebuilt.
+
+    Entries are keyed by path and are only valid as long as the file's size,
+    modification time and inode number stay the same.
+    '''
+
+    #: The schema version of the cache file.
+    schema_version: int = 1
+
+    #: The cached entries, keyed by font path.
+    entries: Dict[str, list]
+
+    def __init__(self, entries: Dict[str, list] = None) -> None:
+        self.entries = entries if entries is not None else {}
+
+    def get(self, path: str, stat: os.stat_result) -> Optional[list]:
+        '''Returns the cached `[family, variant, is_font]` values of a font file,
+        or `None` if the file is not cached or has changed since.
+        '''
+        entry = self.entries.get(path)
+        if entry is None or entry[:3] != FontCache.get_stat_key(stat):
+            return None
+        return entry[3:]
+
+    def set(self, path: str, stat: os.stat_result, family: Optional[str],
+            variant: Optional[str], is_font: bool = True) -> None:
+        '''Cache the parsed values of a font file.'''
+        self.entries[path] = FontCache.get_stat_key(stat) + [family, variant, is_font]
+
+    def diff(self, stats: Dict[str, os.stat_result]) -> FontChanges:
+        '''Compares the cached entries against the current stat results of a
+        font directory, and returns the files that changed.
+        '''
+        return diff_stats({path: entry[:3] for path, entry in self.entries.items()}, stats)
+
+    def prune(self, paths: Iterable[str]) -> int:
+        '''Remove all entries that are not in `paths`. Returns the number of
+        entries removed.
+        '''
+        paths = set(paths)
+        removed = [path for path in self.entries if path not in paths]
+        for path in removed:
+            del self.entries[path]
+        return len(removed)
+
+    def save(self, path: str = None) -> None:
+        '''Save the cache to disk.'''
+        path = path if path else FONT_CACHE_PATH
+        atomic_file.save_json(path, self.schema_version, {'fonts': self.entries})
+
+    @staticmethod
+    def get_stat_key(stat: os.stat_result) -> List[int]:
+        '''Returns the values of a stat result that identify a file's contents.'''
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    @staticmethod
+    def load(path: str = None) -> 'FontCache':
+        '''Load the cache from disk. Returns an empty cache if the cache file
+        does not exist or cannot be read.
+        '''
+        path = path if path else FONT_CACHE_PATH
+
+        data = atomic_file.load_json(path, FontCache.schema_version)
+        if data is None:
+            return FontCache()
+
+        return FontCache(entries=data.get('fonts', {}))
+
+
+def diff_stats(keys: Dict[str, list], stats: Dict[str, os.stat_result]) -> FontChanges:
+    '''Compares the stat keys of a font directory's files, as returned by
+    `FontCache.get_stat_key()`, against their current stat results, and returns
+    the files that changed.
+    '''
+    added = []
+    modified = []
+    for path, stat in stats.items():
+        key = keys.get(path)
+        if key is None:
+            added.append(path)
+        elif key != FontCache.get_stat_key(stat):
+            modified.append(path)
+    removed = [path for path in keys if path not in stats]
+
+    return FontChanges(added=added, modified=modified, removed=removed)
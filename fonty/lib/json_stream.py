@@ -0,0 +1,91 @@
+'''json_stream.py: Incrementally decode large JSON documents.'''
+import re
+import json
+from typing import Any, Iterator, Tuple, Iterable, Union
+
+#: Matches JSON whitespace.
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+DECODER = json.JSONDecoder()
+
+Member = Tuple[str, int, Any]
+
+def decode_text(data: Union[str, bytes]) -> str:
+    '''Decode a JSON document to a string, detecting its encoding like `json.loads()`.'''
+    if isinstance(data, str):
+        return data
+    return data.decode(json.detect_encoding(data), 'surrogatepass')
+
+def iter_members(text: str, array_keys: Iterable[str] = ()) -> Iterator[Member]:
+    '''Iterates over the members of a top-level JSON object without decoding
+    the document as a whole.
+
+    Yields a `(key, offset, value)` tuple for each member, where `offset` is
+    the position of the value in `text`. The values of the keys in
+    `array_keys` must be arrays, and their elements are yielded one by one as
+    `(key, offset, element)` instead, so that only one element is decoded at a
+    time. Raises `json.JSONDecodeError` if the document is not valid JSON.
+    '''
+    array_keys = set(array_keys)
+
+    idx = _expect(text, _skip(text, 0), '{')
+    if _peek(text, idx) == '}':
+        idx += 1
+    else:
+        while True:
+            # Decode the member's key
+            if _peek(text, idx) != '"':
+                raise json.JSONDecodeError('Expecting property name enclosed in double quotes',
+                                           text, idx)
+            key, idx = DECODER.raw_decode(text, idx)
+            idx = _expect(text, _skip(text, idx), ':')
+
+            # Decode the member's value, one element at a time for arrays
+            if key in array_keys:
+                idx = _expect(text, idx, '[')
+                if _peek(text, idx) == ']':
+                    idx += 1
+                else:
+                    while True:
+                        offset = idx
+                        value, idx = DECODER.raw_decode(text, idx)
+                        yield key, offset, value
+                        idx = _skip(text, idx)
+                        if _peek(text, idx) == ']':
+                            idx += 1
+                            break
+                        idx = _expect(text, idx, ',')
+            else:
+                offset = idx
+                value, idx = DECODER.raw_decode(text, idx)
+                yield key, offset, value
+
+            idx = _skip(text, idx)
+            if _peek(text, idx) == '}':
+                idx += 1
+                break
+            idx = _expect(text, idx, ',')
+
+    if _skip(text, idx) != len(text):
+        raise json.JSONDecodeError('Extra data', text, idx)
+
+def decode_at(text: str, offset: int) -> Any:
+    '''Decode the JSON value at a position of a document.'''
+    value, _ = DECODER.raw_decode(text, offset)
+    return value
+
+def _skip(text: str, idx: int) -> int:
+    '''Returns the position of the next non-whitespace character.'''
+    return WHITESPACE.match(text, idx).end()
+
+def _peek(text: str, idx: int) -> str:
+    '''Returns the character at a position, or an empty string at the end of the text.'''
+    return text[idx:idx + 1]
+
+def _expect(text: str, idx: int, char: str) -> int:
+    '''Checks that the character at a position is `char`, and returns the
+    position of the next non-whitespace character after it.
+    '''
+    if _peek(text, idx) != char:
+        raise json.JSONDecodeError("Expecting '{}' delimiter".format(char), text, idx)
+    return _skip(text, idx + 1)
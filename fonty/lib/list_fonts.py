@@ -1,40 +1,49 @@
 '''list_fonts.py: Cross-platform module to get list of installed fonts.'''
 import os
 import sys
-import codecs
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Tuple, Optional, Dict
 
-from fontTools.ttLib import TTFont, TTLibError
+from fontTools.ttLib import TTLibError
 from fonty.lib.variants import FontAttribute
+from fonty.lib.name_table import read_family_and_variant
+from fonty.lib.config import CommonConfiguration
+from fonty.lib.font_cache import FontCache
+from fonty.lib import utils
 from fonty.models.font import Font, FontFamily
 
-FONT_NAMEID_FAMILY = 1
-FONT_NAMEID_VARIANT = 2
-FONT_NAMEID_FAMILY_PREFFERED = 16
-FONT_NAMEID_VARIANT_PREFFERED = 17
+#: Font directories with fewer files than this are always scanned serially,
+#: as the cost of spawning worker processes outweighs the parsing work.
+PARALLEL_SCAN_THRESHOLD = 200
 
-def get_user_fonts() -> List[FontFamily]:
-    '''Returns the list of installed user fonts in this system.'''
-    platform_ = sys.platform
+#: The number of chunks handed to each worker process.
+CHUNKS_PER_WORKER = 4
 
-    if platform_ == 'darwin': # OSX
-        return _get_user_fonts_osx()
-    elif platform_ == 'win32' or platform_ == 'cygwin': # Windows
-        return _get_user_fonts_win()
-    else:
-        raise Exception("Unsupported platform")
+ScanEntry = Tuple[str, Optional[str], Optional[str]]
 
-    return None
+def get_user_fonts(
+        workers: int = None,
+        use_cache: bool = True,
+        stats: Dict[str, os.stat_result] = None
+    ) -> List[FontFamily]:
+    '''Returns the list of installed user fonts in this system.
 
-def _get_user_fonts_osx() -> List[FontFamily]:
-    '''Returns the list of installed user fonts in this OSX system.'''
-    font_dir = os.path.join(os.path.expanduser('~/Library/Fonts'))
-    font_files = [os.path.join(font_dir, f) for f in os.listdir(font_dir)
-                  if os.path.isfile(os.path.join(font_dir, f)) and
-                  not f.startswith('.')]
+    If `use_cache` is true, only font files that were added or changed since
+    the last call are parsed. The rest are read from the font cache. `stats`
+    may be passed to reuse the result of `get_user_font_stats()`.
+    '''
+    stats = stats if stats is not None else get_user_font_stats()
+    font_files = list(stats)
+    cache = FontCache.load() if use_cache else None
 
     # Parse font files
-    data = parse_fonts(font_files)
+    data = parse_fonts(font_files, workers=workers, cache=cache, stats=stats)
+
+    # Drop entries of deleted font files and persist the cache
+    if cache is not None:
+        cache.prune(font_files)
+        cache.save()
 
     # Convert font family data into FontFamily instances
     families = []
@@ -48,60 +57,55 @@ def _get_user_fonts_osx() -> List[FontFamily]:
 
     return families
 
-def _get_user_fonts_win() -> List[FontFamily]:
-    '''Returns the list of installed fonts in this Windows system.'''
-    font_dir = os.path.join(os.environ['WINDIR'], 'Fonts')
-    font_files = [os.path.join(font_dir, f) for f in os.listdir(font_dir)
-                  if os.path.isfile(os.path.join(font_dir, f)) and
-                  not f.startswith('.')]
-
-    # Parse font files
-    data = parse_fonts(font_files)
-
-    # Convert font family data into FontFamily instances
-    families = []
-    for family_name, val in data.items():
-        fonts = [Font(
-            path_to_font=font['local_path'],
-            family=family_name,
-            variant=font['variant']
-        ) for font in val['fonts']]
-        families.append(FontFamily(name=val['name'], fonts=fonts))
+def get_user_font_dir() -> str:
+    '''Returns the directory of installed user fonts in this system.'''
+    platform_ = sys.platform
 
-    return families
+    if platform_ == 'darwin': # OSX
+        return os.path.join(os.path.expanduser('~/Library/Fonts'))
+    elif platform_ == 'win32' or platform_ == 'cygwin': # Windows
+        return os.path.join(os.environ['WINDIR'], 'Fonts')
+    else:
+        raise Exception("Unsupported platform")
 
-def parse_fonts(fonts: List[str]):
-    '''Parse a list of font paths and group them into their families.'''
+def get_user_font_files() -> List[str]:
+    '''Returns the paths of all installed user font files in this system.'''
+    return list(get_user_font_stats())
+
+def get_user_font_stats() -> Dict[str, os.stat_result]:
+    '''Returns the stat results of all installed user font files in this
+    system, keyed by path.
+    '''
+    stats = {}
+    with os.scandir(get_user_font_dir()) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.is_file():
+                continue
+            stats[entry.path] = entry.stat()
+    return stats
+
+def get_font_dir_signature(stats: Dict[str, os.stat_result]) -> dict:
+    '''Returns a signature of a font directory's contents, consisting of the
+    stat key of each of its files, keyed by path.
+    '''
+    return {'files': {path: FontCache.get_stat_key(stat) for path, stat in stats.items()}}
+
+def parse_fonts(
+        fonts: List[str],
+        workers: int = None,
+        cache: FontCache = None,
+        stats: Dict[str, os.stat_result] = None
+    ):
+    '''Parse a list of font paths and group them into their families.
+
+    If `workers` is greater than 1, the font files are parsed in a pool of
+    worker processes. The output is identical to a serial parse. If a `cache`
+    is provided, unchanged files are read from it instead of being parsed.
+    '''
     families: dict = {}
 
-    for font_path in fonts:
-        try:
-            font = TTFont(file=font_path)
-        except TTLibError:
-            continue
-        family = None
-        variant = None
-
-        # Parse font file and retrieve family name and variant
-        for record in font['name'].names:
-
-            # Decode bytes
-            if b'\x00' in record.string:
-                data = record.string.decode('utf-16-be')
-            elif b'\xa9' in record.string:
-                data = codecs.decode(record.string, errors='ignore')
-            else:
-                data = codecs.decode(record.string, errors='ignore')
-
-            if record.nameID == FONT_NAMEID_FAMILY and family is None:
-                family = data
-            elif record.nameID == FONT_NAMEID_FAMILY_PREFFERED:
-                family = data
-            elif record.nameID == FONT_NAMEID_VARIANT and variant is None:
-                variant = data.lower()
-            elif record.nameID == FONT_NAMEID_VARIANT_PREFFERED:
-                variant = data.lower()
-
+    entries = scan_fonts(fonts, workers=workers, cache=cache, stats=stats)
+    for font_path, family, variant in entries:
         if variant is not None:
             variant = FontAttribute.parse(variant)
 
@@ -116,31 +120,115 @@ def parse_fonts(fonts: List[str]):
 
     return families
 
+def scan_fonts(
+        fonts: List[str],
+        workers: int = None,
+        cache: FontCache = None,
+        stats: Dict[str, os.stat_result] = None
+    ) -> List[ScanEntry]:
+    '''Reads the family and variant names of a list of font paths.
+
+    Returns a list of `(path, family, variant)` tuples in the same order as
+    `fonts`. Files that cannot be read as fonts are skipped. If a `cache` is
+    provided, only files missing from the cache are read, and the cache is
+    updated with the results. Files that are not fonts are cached as such,
+    but files that could not be opened are not, so that they are read again
+    next time. Known stat results can be passed in `stats`.
+    '''
+    if cache is None:
+        entries, _ = _read_fonts(fonts, workers)
+        return entries
+
+    # Look up font files in the cache
+    stats = dict(stats) if stats else {}
+    cached = {}
+    for font_path in fonts:
+        if font_path not in stats:
+            try:
+                stats[font_path] = os.stat(font_path)
+            except OSError:
+                continue
+        values = cache.get(font_path, stats[font_path])
+        if values is not None:
+            cached[font_path] = values
+
+    # Read the remaining font files
+    misses = [font_path for font_path in fonts if font_path in stats and font_path not in cached]
+    entries, not_fonts = _read_fonts(misses, workers)
+    parsed = {entry[0]: entry for entry in entries}
+    not_fonts = set(not_fonts)
+
+    # Merge the results in the original order
+    entries = []
+    for font_path in fonts:
+        if font_path in cached:
+            family, variant, is_font = cached[font_path]
+            if is_font:
+                entries.append((font_path, family, variant))
+        elif font_path in parsed:
+            entry = parsed[font_path]
+            cache.set(font_path, stats[font_path], entry[1], entry[2])
+            entries.append(entry)
+        elif font_path in not_fonts:
+            cache.set(font_path, stats[font_path], None, None, is_font=False)
+
+    return entries
+
+def _read_fonts(fonts: List[str], workers: int = None) -> Tuple[List[ScanEntry], List[str]]:
+    '''Reads the family and variant names of a list of font paths, using a
+    pool of worker processes if the list is large enough.
+
+    Returns a `(entries, not_fonts)` tuple, where `not_fonts` contains the
+    paths of the files that were read but are not fonts.
+    '''
+    workers = get_worker_count(workers, len(fonts))
+    if workers <= 1:
+        return _scan_font_chunk(fonts)
+
+    # Split the font list into contiguous chunks so that the merged results
+    # preserve the original ordering
+    chunks = [chunk for chunk in utils.split_list(fonts, workers * CHUNKS_PER_WORKER) if chunk]
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_scan_font_chunk, chunks))
+    except (BrokenProcessPool, OSError):
+        # Process pools are not available in every environment
+        return _scan_font_chunk(fonts)
+
+    return (
+        [entry for entries, _ in results for entry in entries],
+        [path for _, not_fonts in results for path in not_fonts]
+    )
+
+def get_worker_count(workers: int, font_count: int) -> int:
+    '''Resolve the number of worker processes used to scan `font_count` fonts.'''
+    if workers is None:
+        workers = CommonConfiguration.scan_workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+    if font_count < PARALLEL_SCAN_THRESHOLD:
+        return 1
+    return min(workers, font_count)
+
+def _scan_font_chunk(fonts: List[str]) -> Tuple[List[ScanEntry], List[str]]:
+    '''Reads the family and variant names of a chunk of font paths. Returns
+    a `(entries, not_fonts)` tuple like `_read_fonts()`.
+    '''
+    entries = []
+    not_fonts = []
+    for font_path in fonts:
+        try:
+            family, variant = read_family_and_variant(font_path)
+        except TTLibError:
+            not_fonts.append(font_path)
+            continue
+        except OSError:
+            # The file could not be opened, e.g. because of its permissions
+            continue
+        entries.append((font_path, family, variant.lower() if variant is not None else None))
+    return entries, not_fonts
+
 def get_user_fonts_count() -> int:
     '''Returns the total number of installed user fonts in this system.'''
-    platform_ = sys.platform
-
-    if platform_ == 'darwin': # OSX
-        return _get_user_fonts_count_osx()
-    elif platform_ == 'win32' or platform_ == 'cygwin': # Windows
-        return _get_user_fonts_count_win()
-    else:
-        raise Exception("Unsupported platform")
-
-    return None
-
-def _get_user_fonts_count_osx() -> int:
-    '''Returns the total number of installed user fonts in this macOS system.'''
-    font_dir = os.path.join(os.path.expanduser('~/Library/Fonts'))
-    font_files = [name for name in os.listdir(font_dir)
-                  if os.path.isfile(os.path.join(font_dir, name))
-                  and not name.startswith('.')]
-    return len(font_files)
-
-def _get_user_fonts_count_win() -> int:
-    '''Returns the total number of installed user fonts in this Windows system.'''
-    font_dir = os.path.join(os.environ['WINDIR'], 'Fonts')
-    font_files = [os.path.join(font_dir, f) for f in os.listdir(font_dir)
-                  if os.path.isfile(os.path.join(font_dir, f)) and
-                  not f.startswith('.')]
-    return len(font_files)
+    return len(get_user_font_files())
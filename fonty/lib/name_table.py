@@ -0,0 +1,169 @@
+'''fonty.lib.name_table: Lightweight reader for the `name` table of font files.
+
+Opening a font with `fontTools.ttLib.TTFont` and decoding its `name` table
+decodes every name record in the font. fonty only ever needs a handful of
+name IDs (family and subfamily names), so this module reads the sfnt table
+directory, seeks straight to the `name` table and only decodes the records
+that were asked for.
+
+Containers that cannot be read directly (font collections, WOFF2, etc.) fall
+back to fontTools so that the behaviour matches a full parse.
+'''
+import codecs
+import struct
+import zlib
+from typing import List, Tuple, Optional, Iterable, BinaryIO
+
+from fontTools.ttLib import TTFont, TTLibError
+from fonty.lib.font_name_ids import FONT_NAMEID_FAMILY, FONT_NAMEID_FAMILY_PREFFERED, \
+                                    FONT_NAMEID_VARIANT, FONT_NAMEID_VARIANT_PREFFERED
+
+#: The name IDs fonty needs to resolve a font's family and variant.
+NAME_IDS = (
+    int(FONT_NAMEID_FAMILY),
+    int(FONT_NAMEID_VARIANT),
+    int(FONT_NAMEID_FAMILY_PREFFERED),
+    int(FONT_NAMEID_VARIANT_PREFFERED)
+)
+
+# sfnt versions of plain TrueType/OpenType files
+SFNT_VERSIONS = (b'\x00\x01\x00\x00', b'OTTO', b'true', b'typ1')
+WOFF_SIGNATURE = b'wOFF'
+
+SFNT_HEADER = struct.Struct('>4sHHHH')
+SFNT_TABLE_RECORD = struct.Struct('>4sLLL')
+WOFF_HEADER = struct.Struct('>4s4sLHHLHHLLLLL')
+WOFF_TABLE_RECORD = struct.Struct('>4sLLLL')
+NAME_HEADER = struct.Struct('>HHH')
+NAME_RECORD = struct.Struct('>HHHHHH')
+
+
+def read_name_records(path: str, name_ids: Iterable[int] = NAME_IDS) -> List[Tuple[int, str]]:
+    '''Returns the decoded `(name_id, string)` records of a font file's name
+    table, in the same order as they appear in the table.
+
+    Only records with a name ID in `name_ids` are decoded. Raises `TTLibError`
+    if the file is not a readable font.
+    '''
+    name_ids = frozenset(name_ids)
+
+    with open(path, 'rb') as f:
+        tag = f.read(4)
+        f.seek(0)
+
+        if tag in SFNT_VERSIONS:
+            data = _read_sfnt_name_table(f)
+        elif tag == WOFF_SIGNATURE:
+            data = _read_woff_name_table(f)
+        else:
+            data = None
+
+    # Let fontTools handle everything else
+    if data is None:
+        return _read_name_records_fonttools(path, name_ids)
+
+    return _parse_name_table(data, name_ids)
+
+def read_family_and_variant(path: str) -> Tuple[Optional[str], Optional[str]]:
+    '''Returns a tuple of `(family, variant)` strings of a font file.
+
+    The typographic (preferred) family and subfamily names take precedence
+    over the legacy family and subfamily names. Either value may be `None`
+    if the font does not define it.
+    '''
+    family = None
+    variant = None
+
+    for name_id, data in read_name_records(path):
+        if name_id == NAME_IDS[0] and family is None:
+            family = data
+        elif name_id == NAME_IDS[2]:
+            family = data
+        elif name_id == NAME_IDS[1] and variant is None:
+            variant = data
+        elif name_id == NAME_IDS[3]:
+            variant = data
+
+    return family, variant
+
+def decode_name_string(string: bytes) -> str:
+    '''Decodes the raw bytes of a name record.'''
+    if b'\x00' in string:
+        return string.decode('utf-16-be')
+    return codecs.decode(string, errors='ignore')
+
+def _read_sfnt_name_table(f: BinaryIO) -> bytes:
+    '''Reads the raw `name` table of a TrueType/OpenType file.'''
+    header = f.read(SFNT_HEADER.size)
+    if len(header) < SFNT_HEADER.size:
+        raise TTLibError('Not a TrueType or OpenType font (not enough data)')
+    _, num_tables, _, _, _ = SFNT_HEADER.unpack(header)
+
+    directory = f.read(SFNT_TABLE_RECORD.size * num_tables)
+    if len(directory) < SFNT_TABLE_RECORD.size * num_tables:
+        raise TTLibError('Truncated table directory')
+    for tag, _, offset, length in SFNT_TABLE_RECORD.iter_unpack(directory):
+        if tag == b'name':
+            f.seek(offset)
+            data = f.read(length)
+            if len(data) < length:
+                raise TTLibError("Truncated 'name' table")
+            return data
+
+    raise TTLibError("Font has no 'name' table")
+
+def _read_woff_name_table(f: BinaryIO) -> bytes:
+    '''Reads and decompresses the raw `name` table of a WOFF file.'''
+    header = f.read(WOFF_HEADER.size)
+    if len(header) < WOFF_HEADER.size:
+        raise TTLibError('Not a WOFF font (not enough data)')
+    num_tables = WOFF_HEADER.unpack(header)[3]
+
+    directory = f.read(WOFF_TABLE_RECORD.size * num_tables)
+    if len(directory) < WOFF_TABLE_RECORD.size * num_tables:
+        raise TTLibError('Truncated table directory')
+    for tag, offset, comp_length, orig_length, _ in WOFF_TABLE_RECORD.iter_unpack(directory):
+        if tag == b'name':
+            f.seek(offset)
+            data = f.read(comp_length)
+            if len(data) < comp_length:
+                raise TTLibError("Truncated 'name' table")
+            if comp_length < orig_length:
+                try:
+                    data = zlib.decompress(data)
+                except zlib.error as e:
+                    raise TTLibError("Corrupt 'name' table: {}".format(e)) from None
+            return data
+
+    raise TTLibError("Font has no 'name' table")
+
+def _parse_name_table(data: bytes, name_ids: frozenset) -> List[Tuple[int, str]]:
+    '''Decodes the requested records from a raw `name` table.'''
+    if len(data) < NAME_HEADER.size:
+        raise TTLibError("Truncated 'name' table")
+    _, count, string_offset = NAME_HEADER.unpack_from(data)
+
+    records = []
+    for i in range(count):
+        record_offset = NAME_HEADER.size + i * NAME_RECORD.size
+        if record_offset + NAME_RECORD.size > len(data):
+            break
+        _, _, _, name_id, length, offset = NAME_RECORD.unpack_from(data, record_offset)
+        if name_id not in name_ids:
+            continue
+
+        start = string_offset + offset
+        records.append((name_id, decode_name_string(data[start:start + length])))
+
+    return records
+
+def _read_name_records_fonttools(path: str, name_ids: frozenset) -> List[Tuple[int, str]]:
+    '''Reads name records with fontTools. Used for unsupported containers.'''
+    font = TTFont(file=path)
+    try:
+        return [
+            (record.nameID, decode_name_string(record.string))
+            for record in font['name'].names if record.nameID in name_ids
+        ]
+    finally:
+        font.close()
@@ -0,0 +1,133 @@
+'''network.py: The HTTP client shared by all of fonty's network requests.'''
+import threading
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from fonty.lib.config import CommonConfiguration
+
+#: The number of hosts that keep a pool of connections open.
+POOL_CONNECTIONS = 10
+
+#: The HTTP status codes of responses that are retried.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+#: The base delay between retries in seconds. It doubles after every retry.
+RETRY_BACKOFF_FACTOR = 0.5
+
+#: The connect and read timeouts of background requests in seconds.
+BACKGROUND_TIMEOUT = (3, 5)
+
+_session: Optional[requests.Session] = None
+_background_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    '''A `HTTPAdapter` that applies a default timeout to requests that are
+    sent without one.
+    '''
+
+    def __init__(self, *args, timeout=None, **kwargs) -> None:
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs): # pylint: disable=W0221
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+
+def get_session() -> requests.Session:
+    '''Returns the HTTP session that is shared by all of fonty's requests.
+
+    The session keeps a pool of connections open to each host, so that
+    requests to the same host do not pay for a new TCP and TLS handshake. It
+    is created on first use from the `http_*` configuration values, and can be
+    shared between threads.
+    '''
+    global _session # pylint: disable=W0603
+
+    with _session_lock:
+        if _session is None:
+            _session = create_session()
+        return _session
+
+def get_background_session() -> requests.Session:
+    '''Returns the HTTP session for requests that the user does not wait for,
+    such as telemetry.
+
+    Its requests are never retried and time out after `BACKGROUND_TIMEOUT`,
+    so that an unreachable server cannot keep fonty from exiting.
+    '''
+    global _background_session # pylint: disable=W0603
+
+    with _session_lock:
+        if _background_session is None:
+            _background_session = create_session(retries=0, timeout=BACKGROUND_TIMEOUT)
+        return _background_session
+
+def create_session(retries: int = None, timeout: Tuple[float, float] = None) -> requests.Session:
+    '''Create a HTTP session from the `http_*` configuration values.
+
+    Requests time out if a connection cannot be made within
+    `http_connect_timeout` seconds, or if the server does not send any data
+    for `http_read_timeout` seconds. Idempotent requests that fail to connect
+    or receive a retryable status code are retried up to `http_retries`
+    times, with exponential backoff. Compressed responses are accepted unless
+    `http_compression` is disabled. `retries` and `timeout` override the
+    configured values.
+    '''
+    if retries is None:
+        retries = CommonConfiguration.http_retries
+    if timeout is None:
+        timeout = (CommonConfiguration.http_connect_timeout, CommonConfiguration.http_read_timeout)
+
+    retry = Retry(
+        total=max(retries, 0),
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=frozenset(['HEAD', 'GET', 'OPTIONS']),
+        raise_on_status=False
+    )
+
+    # Keep enough connections open to each host for every download worker
+    adapter = TimeoutHTTPAdapter(
+        timeout=timeout,
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=max(CommonConfiguration.download_workers, 1),
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    if not CommonConfiguration.http_compression:
+        session.headers['Accept-Encoding'] = 'identity'
+
+    return session
+
+def close_session() -> None:
+    '''Close the shared HTTP sessions and their connections. New sessions are
+    created the next time they are needed.
+    '''
+    global _session, _background_session # pylint: disable=W0603
+
+    with _session_lock:
+        for session in (_session, _background_session):
+            if session is not None:
+                session.close()
+        _session = None
+        _background_session = None
+
+def get(url: str, **kwargs) -> requests.Response:
+    '''Send a GET request with the shared HTTP session.'''
+    return get_session().get(url, **kwargs)
+
+def post(url: str, **kwargs) -> requests.Response:
+    '''Send a POST request with the shared HTTP session. POST requests are
+    never retried.
+    '''
+    return get_session().post(url, **kwargs)
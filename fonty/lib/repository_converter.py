@@ -0,0 +1,115 @@
+'''repository_converter.py: Convert `fonty_json_schema_v1` repositories to
+`fonty_json_schema_v2`.
+
+Usage:
+    python -m fonty.lib.repository_converter INPUT OUTPUT [--fetch]
+
+With `--fetch`, every font file is downloaded to record its byte size and
+SHA-256 hash. Otherwise, these fields are left empty.
+'''
+import os
+import json
+import hashlib
+from typing import Tuple, Optional
+from urllib.parse import urlparse
+
+import click
+from fonty.lib import network
+from fonty.lib.variants import FontAttribute
+from fonty.models.font import FontFormat
+
+#: The separators used to serialise typefaces.
+SEPARATORS = (',', ':')
+
+def convert_v1_to_v2(data: dict, fetch: bool = False) -> str:
+    '''Convert a `fonty_json_schema_v1` repository into a
+    `fonty_json_schema_v2` JSON document.
+
+    The header of the document contains the number of typefaces, and an index
+    of the position of each typeface relative to the first typeface. If two
+    typefaces share a name, only the first one is indexed, and readers have to
+    scan the typefaces instead.
+    '''
+    if data.get('schema_identifier') != 'fonty_json_schema_v1':
+        raise ValueError("Not a 'fonty_json_schema_v1' repository.")
+
+    # Serialise each typeface on its own to record its position
+    typefaces = []
+    index = {}
+    position = 0
+    for typeface in data['typefaces']:
+        typeface = dict(typeface, fonts=[
+            convert_font(variant, font, fetch) for variant, font in typeface['fonts'].items()
+        ])
+        text = json.dumps(typeface, separators=SEPARATORS)
+
+        index.setdefault(typeface['name'], position)
+        typefaces.append(text)
+        position += len(text) + 1 # Account for the separating comma
+
+    header = {key: value for key, value in data.items() if key != 'typefaces'}
+    header.update({
+        'schema_identifier': 'fonty_json_schema_v2',
+        'family_count': len(typefaces),
+        'index': index
+    })
+
+    # The typefaces must come last, after the header
+    header_text = json.dumps(header, separators=SEPARATORS)
+    return '{},"typefaces":[{}]}}'.format(header_text[:-1], ','.join(typefaces))
+
+def convert_font(variant: str, font: dict, fetch: bool = False) -> dict:
+    '''Convert a `fonty_json_schema_v1` font into a `fonty_json_schema_v2` font.'''
+    attribute = FontAttribute.parse(variant)
+    size, sha256 = get_file_info(font['url']) if fetch else (None, None)
+
+    return {
+        'variant': str(attribute),
+        'weight': attribute.weight.value.css,
+        'style': attribute.style.value.css,
+        'stretch': attribute.stretch.value.css,
+        'misc': attribute.misc,
+        'url': font['url'],
+        'filename': font['filename'],
+        'format': get_format(font['filename'], font['url']),
+        'size': size,
+        'sha256': sha256
+    }
+
+def get_format(filename: str, url: str) -> Optional[str]:
+    '''Returns the format of a font file from its filename or URL.'''
+    for path in (filename, urlparse(url).path):
+        _, ext = os.path.splitext(path)
+        try:
+            return FontFormat(ext[1:].lower()).value
+        except ValueError:
+            continue
+    return None
+
+def get_file_info(url: str) -> Tuple[int, str]:
+    '''Download a file and return its byte size and SHA-256 hash.'''
+    response = network.get(url, stream=True)
+    response.raise_for_status()
+
+    size = 0
+    digest = hashlib.sha256()
+    for chunk in response.iter_content(64 * 1024):
+        size += len(chunk)
+        digest.update(chunk)
+
+    return size, digest.hexdigest()
+
+@click.command()
+@click.argument('input_path', type=click.Path(exists=True, dir_okay=False))
+@click.argument('output_path', type=click.Path(dir_okay=False))
+@click.option('--fetch', is_flag=True, help='Download font files to record their size and hash.')
+def main(input_path, output_path, fetch):
+    '''Convert a fonty_json_schema_v1 repository to fonty_json_schema_v2.'''
+    with open(input_path, encoding='utf-8') as f:
+        data = json.loads(f.read())
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(convert_v1_to_v2(data, fetch=fetch))
+
+if __name__ == '__main__':
+    main() # pylint: disable=E1120
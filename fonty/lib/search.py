@@ -1,78 +1,284 @@
 '''search.py: Library to handle the search of fonts.'''
 
 import os.path
+import json
+import shutil
+import hashlib
+from typing import Dict, List, Tuple, Optional, Iterable, Union, Callable
 import click
 from whoosh.query import Phrase, And, Term
 from whoosh.qparser import QueryParser
 from whoosh.index import create_in, open_dir, EmptyIndexError, Index
-from whoosh.fields import Schema, TEXT, KEYWORD, ID
-from fonty.lib.constants import SEARCH_INDEX_PATH
+from whoosh.fields import Schema, TEXT, KEYWORD, ID, STORED
+from whoosh.writing import IndexWriter
+from fonty.lib.constants import SEARCH_INDEX_PATH, SEARCH_NAMES_PATH, SEARCH_SUGGESTIONS_PATH
+from fonty.lib.config import CommonConfiguration
 from fonty.models.repository import Repository
+from fonty.models.font import RemoteFontFamily, RemoteFont
+from fonty.lib.variants import FontAttribute
+from fonty.lib import suggestions, atomic_file
+from fonty.lib.suggestions import Suggestion
 
 SCHEMA = Schema(
     id=ID(stored=True),
     name=TEXT(stored=True),
     category=KEYWORD(stored=True),
-    repository_path=ID(stored=True)
+    repository_path=ID(stored=True),
+    repository_name=STORED,
+    checksum=ID(stored=True),
+    payload=STORED
 )
 
+#: The schema version of the exact-name index file.
+NAMES_SCHEMA_VERSION = 1
+
+#: The memory limit of each index writer process when rebuilding the index, in MB.
+INDEX_WRITER_LIMITMB = 256
+
+#: The `(family, payload, checksum)` of an indexed font family.
+Document = Tuple[RemoteFontFamily, str, str]
+
+#: A repository, or a function that loads it, and the path to its file.
+RepositorySource = Tuple[Union[Repository, Callable[[], Repository]], str]
+
+#: The path to a repository that failed to index, and the exception it raised.
+IndexFailure = Tuple[str, Exception]
+
 def search(name):
-    '''Search the font index and return results.'''
+    '''Search the font index and return results.
+
+    Exact (case-insensitive) family name matches are looked up in the
+    exact-name index first. If the family is not in the exact-name index,
+    `SearchNotFound` is raised with suggestions from the suggestion index
+    without opening the full-text index. The full-text index is only queried
+    if the exact-name index does not exist, as with indexes created before it
+    was introduced.
+
+    Returns a `(repository, remote_family)` tuple. If the family could be
+    built from its indexed payload, the repository file is not loaded and
+    `repository` only contains the matched family.
+    '''
+    match = find_exact(name)
+    if match is None and os.path.isfile(SEARCH_NAMES_PATH):
+        raise SearchNotFound(name, [s.name for s in get_suggestions(name, limit=3)])
+
     index = load_index()
+    if match is not None:
+        _, id_, _ = match
+        with index.searcher() as searcher:
+            result = searcher.document(id=id_)
+        if result is not None:
+            return load_result(result)
+
     parser = QueryParser('name', SCHEMA)
     query = parser.parse(name)
 
     # Execute search query
-    searcher = index.searcher()
-    results = searcher.search(query)
+    with index.searcher() as searcher:
+        results = searcher.search(query, limit=1)
+        result = dict(**results[0]) if results else None # Convert to Dictionary
 
-    if not results:
-        corrector = searcher.corrector('name')
-        raise SearchNotFound(name, corrector.suggest(name))
+    # Check if exact match
+    if result is None or result['name'].lower() != name.lower():
+        raise SearchNotFound(name, [s.name for s in get_suggestions(name, limit=3)])
 
-    result = dict(**results[0]) # Convert search results object to Dictionary
-    searcher.close()
+    return load_result(result)
 
-    # Check if exact match
-    if results and result['name'].lower() != name.lower():
-        raise SearchNotFound(name, result['name'])
+def get_suggestions(query: str, limit: int = suggestions.DEFAULT_LIMIT) -> List[Suggestion]:
+    '''Returns the indexed font families with names similar to `query`,
+    ranked from the most to the least similar.'''
+    index = suggestions.load_index()
 
-    try:
-        repo = Repository.load_from_path(result['repository_path'])
-        remote_family = repo.get_family(result['name'])
-    except FileNotFoundError:
-        raise
+    # Build the suggestion index of exact-name indexes created before it existed
+    if index is None:
+        index = suggestions.build_index(load_names())
+        suggestions.save_index(index)
+
+    return suggestions.suggest(index, query, limit=limit)
+
+def load_result(result: dict) -> Tuple[Repository, RemoteFontFamily]:
+    '''Returns the `(repository, remote_family)` of a search result.'''
+    # Build the font family from its payload without loading the repository
+    if result.get('payload') is not None:
+        remote_family = deserialize_family(result['name'], result['payload'])
+        repo = Repository(name=result.get('repository_name'), families=[remote_family])
+        return repo, remote_family
+
+    # Documents indexed before payloads were stored. Only the matched family
+    # is decoded from the repository file.
+    repo = Repository.load_from_path(result['repository_path'], lazy=True)
+    remote_family = repo.get_family(result['name'])
 
     return repo, remote_family
 
-def create_index() -> Index:
+def create_index(path: str = SEARCH_INDEX_PATH) -> Index:
     '''Creates a font search schema.'''
-    if not os.path.exists(SEARCH_INDEX_PATH):
-        os.makedirs(SEARCH_INDEX_PATH, exist_ok=True)
-    return create_in(SEARCH_INDEX_PATH, SCHEMA)
+    if not os.path.exists(path):
+        os.makedirs(path, exist_ok=True)
+    return create_in(path, SCHEMA)
 
-def index_fonts(repository: Repository, path_to_repository: str) -> None:
-    '''Indexes a repository's font data.
+def index_fonts(repository: Repository, path_to_repository: str) -> int:
+    '''Indexes a repository's font data. Returns the number of documents that
+       were added, updated or removed.
 
-       A local index file will be automatically created in the user's
-       application directory if an existing index does not exists.
+       Only font families that were added, changed or removed since the
+       repository was last indexed are written to the index. A local index
+       file will be automatically created in the user's application directory
+       if an existing index does not exists.
     '''
 
     index = load_index()
     writer = index.writer()
 
-    # Delete all existing index for this repository and start clean
-    # TODO: Implement incremental indexing
-    writer.delete_by_term('repository_path', path_to_repository)
+    # Upgrade indexes created before documents had checksums and payloads
+    for field_name in ('repository_name', 'checksum', 'payload'):
+        if field_name not in index.schema:
+            writer.add_field(field_name, SCHEMA[field_name])
+
+    # Get the documents currently indexed for this repository
+    with index.searcher() as searcher:
+        indexed = {
+            doc['id']: doc.get('checksum')
+            for doc in searcher.documents(repository_path=path_to_repository)
+        }
+
+    # Get the documents of the new repository
+    families = get_documents(repository, path_to_repository)
+
+    removed = [id_ for id_ in indexed if id_ not in families]
+    changed = [id_ for id_, (_, _, checksum) in families.items() if indexed.get(id_) != checksum]
+
+    if not removed and not changed:
+        writer.cancel()
+    else:
+        try:
+            # Delete removed and outdated documents
+            for id_ in removed + changed:
+                if id_ in indexed:
+                    writer.delete_by_term('id', id_)
+
+            # Index new and changed font families
+            for id_ in changed:
+                add_document(writer, repository, path_to_repository, id_, families[id_])
+            writer.commit()
+        except BaseException:
+            writer.cancel()
+            raise
+
+    # Update the exact-name index once its documents are committed
+    names = load_names()
+    repository_names = get_repository_names(families)
+    if names.get(path_to_repository) != repository_names:
+        names[path_to_repository] = repository_names
+        save_names(names)
+
+    return len(removed) + len(changed)
+
+def rebuild_index(
+    repositories: Iterable[RepositorySource],
+    workers: int = None
+) -> Tuple[int, List[IndexFailure]]:
+    '''Rebuilds the search index from scratch with a list of
+       `(repository, path_to_repository)` tuples. `repository` can also be a
+       function that loads the repository. Returns a `(count, failures)`
+       tuple of the number of documents indexed, and the path and exception
+       of each repository that failed to load.
+
+       All repositories are written by a single writer and committed at once
+       into a single segment, instead of committing once per repository.
+       Repositories are only loaded one at a time. If `workers` is not
+       provided, the `index_workers` configuration value is used.
+
+       The new index is built in a separate directory, and only replaces the
+       current index once it is complete. Repositories that fail to load are
+       left out of the new index.
+    '''
+    if workers is None:
+        workers = CommonConfiguration.index_workers
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+
+    build_path = SEARCH_INDEX_PATH + '.new'
+    shutil.rmtree(build_path, ignore_errors=True)
+    index = create_index(build_path)
+    writer = index.writer(procs=workers, limitmb=INDEX_WRITER_LIMITMB)
+
+    names: Dict[str, Dict[str, list]] = {}
+    failures: List[IndexFailure] = []
+    count = 0
+    try:
+        for repository, path_to_repository in repositories:
+            try:
+                if callable(repository):
+                    repository = repository()
+                families = get_documents(repository, path_to_repository)
+            except Exception as e: # pylint: disable=W0703
+                failures.append((path_to_repository, e))
+                continue
+
+            for id_, document in families.items():
+                add_document(writer, repository, path_to_repository, id_, document)
+            names[path_to_repository] = get_repository_names(families)
+            count += len(families)
+
+        writer.commit(optimize=True)
+        save_names(names, index_path=build_path)
+    except BaseException:
+        writer.cancel()
+        shutil.rmtree(build_path, ignore_errors=True)
+        raise
+
+    replace_index(build_path)
+
+    return count, failures
 
-    # Index all font families in this repository
+def replace_index(path: str) -> None:
+    '''Replace the search index with the complete index at `path`.'''
+    old_path = SEARCH_INDEX_PATH + '.old'
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(SEARCH_INDEX_PATH):
+        os.rename(SEARCH_INDEX_PATH, old_path)
+    os.rename(path, SEARCH_INDEX_PATH)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+def get_documents(repository: Repository, path_to_repository: str) -> Dict[str, Document]:
+    '''Returns the `(family, payload, checksum)` of each font family of a
+       repository to be indexed, by document ID. Only the first family of a
+       name is indexed, as `Repository.get_family()` only ever returns that one.
+    '''
+    families: Dict[str, Document] = {}
     for family in repository.families:
-        writer.add_document(
-            id=family.generate_id(path_to_repository),
-            name=family.name,
-            repository_path=path_to_repository
-        )
-    writer.commit()
+        id_ = family.generate_id(path_to_repository)
+        if id_ not in families:
+            payload = serialize_family(family)
+            checksum = get_checksum(repository.name, family.name, payload)
+            families[id_] = (family, payload, checksum)
+    return families
+
+def add_document(
+    writer: IndexWriter,
+    repository: Repository,
+    path_to_repository: str,
+    id_: str,
+    document: Document
+) -> None:
+    '''Adds the document of a font family to an index writer.'''
+    family, payload, checksum = document
+    writer.add_document(
+        id=id_,
+        name=family.name,
+        repository_path=path_to_repository,
+        repository_name=repository.name,
+        checksum=checksum,
+        payload=payload
+    )
+
+def get_repository_names(families: Dict[str, Document]) -> Dict[str, list]:
+    '''Returns the exact-name index entries of a repository's documents.'''
+    repository_names: Dict[str, list] = {}
+    for id_, (family, _, _) in families.items():
+        repository_names.setdefault(get_name_key(family.name), [id_, family.name])
+    return repository_names
 
 def unindex_fonts(path_to_repository: str) -> int:
     '''Unindex a entire repository. Returns the number of documents deleted.'''
@@ -83,8 +289,85 @@ def unindex_fonts(path_to_repository: str) -> int:
     count = writer.delete_by_term('repository_path', path_to_repository)
     writer.commit()
 
+    # Remove the repository from the exact-name index
+    names = load_names()
+    if names.pop(path_to_repository, None) is not None:
+        save_names(names)
+
     return count
 
+def find_exact(name: str) -> Optional[Tuple[str, str, str]]:
+    '''Looks up a font family by its exact, case-insensitive name.
+
+    Returns a `(repository_path, id, family_name)` tuple, or `None` if no
+    indexed family has this name.
+    '''
+    key = get_name_key(name)
+    for path_to_repository, repository_names in load_names().items():
+        if key in repository_names:
+            id_, family_name = repository_names[key]
+            return path_to_repository, id_, family_name
+    return None
+
+def get_name_key(name: str) -> str:
+    '''Returns the exact-name index key of a font family name.'''
+    return name.casefold()
+
+def load_names() -> Dict[str, Dict[str, list]]:
+    '''Loads the exact-name index. It maps each repository path to a dict of
+    `{casefolded_name: [id, family_name]}`. Returns an empty index if the file
+    does not exist or cannot be read.
+    '''
+    data = atomic_file.load_json(SEARCH_NAMES_PATH, NAMES_SCHEMA_VERSION)
+    if data is None:
+        return {}
+
+    return data.get('repositories', {})
+
+def save_names(names: Dict[str, Dict[str, list]], index_path: str = SEARCH_INDEX_PATH) -> None:
+    '''Saves the exact-name index, and rebuilds the suggestion index from it.
+    Both are saved in the search index directory at `index_path`.
+    '''
+    atomic_file.save_json(
+        os.path.join(index_path, os.path.basename(SEARCH_NAMES_PATH)),
+        NAMES_SCHEMA_VERSION,
+        {'repositories': names}
+    )
+
+    suggestions.save_index(
+        suggestions.build_index(names),
+        path=os.path.join(index_path, os.path.basename(SEARCH_SUGGESTIONS_PATH))
+    )
+
+def serialize_family(family: RemoteFontFamily) -> str:
+    '''Returns a compact serialised form of a font family's fonts, as a list
+    of `[variant, url, filename, size, sha256]` lists.
+    '''
+    return json.dumps([
+        [str(font.variant), font.remote_path.path, font.filename, font.size, font.sha256]
+        for font in family.fonts
+    ], separators=(',', ':'))
+
+def deserialize_family(name: str, payload: str) -> RemoteFontFamily:
+    '''Create a RemoteFontFamily instance from a serialised font family.'''
+    fonts = []
+    for variant, url, filename, *info in json.loads(payload):
+        size, sha256 = info if info else (None, None) # Payloads without file info
+        fonts.append(RemoteFont(
+            remote_path=RemoteFont.Path(path=url, type=RemoteFont.Path.Type.HTTP_REMOTE),
+            filename=filename,
+            family=name,
+            variant=FontAttribute.parse(variant),
+            size=size,
+            sha256=sha256
+        ))
+    return RemoteFontFamily(name=name, fonts=fonts)
+
+def get_checksum(repository_name: str, name: str, payload: str) -> str:
+    '''Returns a checksum of an indexed font family document.'''
+    data = json.dumps([repository_name, name, payload])
+    return hashlib.md5(data.encode('utf-8')).hexdigest()
+
 def load_index(create: bool = True) -> Index:
     '''Loads a search index file. If one does not exist, create it.'''
     try:
@@ -105,5 +388,8 @@ class SearchNotFound(Exception):
         self.keyword = keyword
 
         if isinstance(suggestion, list):
+            self.suggestions = suggestion
             suggestion = ', '.join(suggestion)
+        else:
+            self.suggestions = [suggestion] if suggestion else []
         self.suggestion = suggestion
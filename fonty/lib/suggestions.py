@@ -0,0 +1,123 @@
+'''suggestions.py: A typo-tolerant index of font family names.
+
+Family names are broken down into trigrams, the three-letter sequences of
+each word padded with spaces (e.g. "lato" becomes "  l", " la", "lat", "ato"
+and "to "). Names are ranked by the number of trigrams that they share with
+a query, so misspelled queries like "Open Sns" still find "Open Sans".
+'''
+import re
+import heapq
+import pickle
+from array import array
+from collections import namedtuple, defaultdict, Counter
+from itertools import chain
+from typing import Dict, List, Optional, Set
+
+from fonty.lib.constants import SEARCH_SUGGESTIONS_PATH
+from fonty.lib import atomic_file
+
+#: The version of the suggestion index file format.
+SUGGESTIONS_VERSION = 1
+
+#: The default number of suggestions returned by `suggest()`.
+DEFAULT_LIMIT = 5
+
+#: The minimum similarity score of a suggestion, between 0 and 1.
+MIN_SCORE = 0.3
+
+#: Matches the words of a font family name.
+WORD_RE = re.compile(r'\w+')
+
+Suggestion = namedtuple('Suggestion', 'name, score, repository_paths')
+
+def build_index(names: Dict[str, Dict[str, list]]) -> dict:
+    '''Build a suggestion index from an exact-name index, which maps each
+    repository path to a dict of `{casefolded_name: [id, family_name]}`.
+    '''
+    keys: Dict[str, int] = {}
+    family_names: List[str] = []
+    repository_paths: List[List[str]] = []
+    for path_to_repository, repository_names in names.items():
+        for key, (_, family_name) in repository_names.items():
+            if key not in keys:
+                keys[key] = len(family_names)
+                family_names.append(family_name)
+                repository_paths.append([])
+            repository_paths[keys[key]].append(path_to_repository)
+
+    # Map each trigram to the positions of the names that contain it
+    postings: Dict[str, array] = defaultdict(lambda: array('I'))
+    sizes = array('I')
+    for key, idx in keys.items():
+        trigrams = get_trigrams(key)
+        sizes.append(len(trigrams))
+        for trigram in trigrams:
+            postings[trigram].append(idx)
+
+    return {
+        'version': SUGGESTIONS_VERSION,
+        'names': family_names,
+        'repository_paths': [tuple(paths) for paths in repository_paths],
+        'sizes': sizes,
+        'postings': dict(postings)
+    }
+
+def suggest(index: dict, query: str, limit: int = DEFAULT_LIMIT) -> List[Suggestion]:
+    '''Returns up to `limit` font family names that are similar to `query`,
+    ranked from the most to the least similar.
+
+    Names are scored by the Dice coefficient of their trigrams and the
+    query's trigrams. Ties are broken in favour of names that are closest in
+    length to the query, and then of names that were indexed first.
+    '''
+    trigrams = get_trigrams(query.casefold())
+    if not trigrams:
+        return []
+
+    # Count the trigrams each name shares with the query
+    postings = index['postings']
+    counts = Counter(chain.from_iterable(postings.get(trigram, ()) for trigram in trigrams))
+
+    sizes = index['sizes']
+    candidates = (
+        (2 * count / (len(trigrams) + sizes[idx]), abs(sizes[idx] - len(trigrams)), idx)
+        for idx, count in counts.items()
+    )
+    ranked = heapq.nlargest(
+        limit,
+        (candidate for candidate in candidates if candidate[0] >= MIN_SCORE),
+        key=lambda candidate: (candidate[0], -candidate[1], -candidate[2])
+    )
+
+    return [
+        Suggestion(index['names'][idx], round(score, 3), index['repository_paths'][idx])
+        for score, _, idx in ranked
+    ]
+
+def get_trigrams(name: str) -> Set[str]:
+    '''Returns the trigrams of a (casefolded) font family name.'''
+    trigrams = set()
+    for word in WORD_RE.findall(name):
+        word = '  {} '.format(word)
+        trigrams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return trigrams
+
+def load_index() -> Optional[dict]:
+    '''Loads the suggestion index. Returns `None` if it does not exist or
+    cannot be read.
+    '''
+    try:
+        with open(SEARCH_SUGGESTIONS_PATH, 'rb') as f:
+            index = pickle.load(f)
+    except Exception: # pylint: disable=W0703
+        return None
+
+    if not isinstance(index, dict) or index.get('version') != SUGGESTIONS_VERSION:
+        return None
+
+    return index
+
+def save_index(index: dict, path: str = SEARCH_SUGGESTIONS_PATH) -> None:
+    '''Saves the suggestion index.'''
+    with atomic_file.atomic_write(path, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
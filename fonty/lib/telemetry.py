@@ -7,8 +7,8 @@ from enum import Enum
 from datetime import datetime
 from typing import Tuple
 
-import requests
 from fonty.version import __version__
+from fonty.lib import network
 from fonty.lib.json_encoder import FontyJSONEncoder
 from fonty.lib.constants import TELEMETRY_ENDPOINT, JSON_DUMP_OPTS
 from fonty.lib.config import CommonConfiguration
@@ -22,10 +22,14 @@ class TelemetryEventTypes(Enum):
     FONT_LIST = 'FONT_LIST'
     FONT_LIST_REBUILD = 'FONT_LIST_REBUILD'
     FONT_CONVERT = 'FONT_CONVERT'
+    FONT_SEARCH = 'FONT_SEARCH'
     SOURCE_LIST = 'SOURCE_LIST'
     SOURCE_ADD = 'SOURCE_ADD'
     SOURCE_REMOVE = 'SOURCE_REMOVE'
     SOURCE_UPDATE = 'SOURCE_UPDATE'
+    CACHE_STATS = 'CACHE_STATS'
+    CACHE_PRUNE = 'CACHE_PRUNE'
+    CACHE_CLEAR = 'CACHE_CLEAR'
 
 
 class TelemetryEvent:
@@ -110,7 +114,7 @@ class TelemetryEvent:
 
     def _send_request(self, d):
         try:
-            requests.post(
+            network.get_background_session().post(
                 url=TELEMETRY_ENDPOINT,
                 data=json.dumps(d, cls=FontyJSONEncoder, **JSON_DUMP_OPTS),
                 headers={'Content-Type': 'application/json'}
@@ -4,6 +4,8 @@ import re
 import sys
 from collections import namedtuple
 from enum import Enum
+from functools import lru_cache
+from typing import Iterable, List
 
 Data = namedtuple('Data', 'name, id, css, hidden')
 
@@ -30,24 +32,46 @@ class FONT_STRETCH(Enum):
 
 
 class FontAttribute:
+    '''The weight, style and stretch of a font.
+
+    Instances returned by `parse()` are shared between all callers that parse
+    the same string, so they must be treated as immutable. Two attributes are
+    equal if they have the same canonical `key`.
+    '''
+    __slots__ = ('weight', 'style', 'stretch', 'misc', '_raw', '_key')
+
     def __init__(self, weight, style, stretch, misc: str = None, _raw = None) -> None:
         self.weight = weight
         self.style = style
         self.stretch = stretch
         self.misc = misc
         self._raw = _raw
+        self._key = None
 
     def __str__(self):
-        return self.print()
+        return self.key
+
+    def __repr__(self):
+        return '<FontAttribute {}>'.format(self.key)
 
     def __eq__(self, other):
         if (isinstance(other, self.__class__)):
-            return str(self) == str(other)
+            return self.key == other.key
         return False
-    
+
     def __ne__(self, other):
         return not self.__eq__(other)
-    
+
+    def __hash__(self):
+        return hash(self.key)
+
+    @property
+    def key(self) -> str:
+        '''The canonical short form of this attribute, e.g. `700i`.'''
+        if self._key is None:
+            self._key = self.print()
+        return self._key
+
     def print(self, long: bool = False, output: bool = False) -> str:
         '''Print this font's attributes'''
         if not self.weight.value.hidden:
@@ -80,8 +104,10 @@ class FontAttribute:
         return s
 
     @staticmethod
-    def parse(variant_str: str):
-        '''Parse a variant string.'''
+    @lru_cache(maxsize=1024)
+    def parse(variant_str: str) -> 'FontAttribute':
+        '''Parse a variant string. Results are memoised, so parsing the same
+        string again returns the same instance.'''
         # Default values
         weight = FONT_WEIGHT.REGULAR
         style = FONT_STYLE.NORMAL
@@ -95,15 +121,11 @@ class FontAttribute:
         variant_str = ''.join(s.strip() for s in variant_str.split(' '))
         variant_str = variant_str.replace('_', '')
 
-        is_css_format = re.match(r'\d00.*', variant_str) is not None
+        is_css_format = CSS_FORMAT_RE.match(variant_str) is not None
 
         # Parse the variant string
         if is_css_format:
-            css_re = re.compile('(\d{{3}})({styles})?_*({stretch})?_*(.+)?'.format(
-                styles=('|'.join(key for key, _ in CSS_STYLE_MAP.items())),
-                stretch='|'.join(key for key, _ in STRETCH_MAP.items())
-            ))
-            m = css_re.search(variant_str)
+            m = CSS_VARIANT_RE.search(variant_str)
             if m is not None:
                 if m.group(1): # Weight
                     weight = CSS_WEIGHT_MAP[m.group(1)]
@@ -115,30 +137,21 @@ class FontAttribute:
                     misc = m.group(4)
         else:
             # Parse weight from string and remove the match from the string
-            weight_re = re.compile('({})'.format(
-                '|'.join(key for key, _ in WEIGHT_MAP.items())
-            ))
-            m = weight_re.search(variant_str)
+            m = WEIGHT_RE.search(variant_str)
             if m is not None:
                 weight_str = variant_str[m.start(0):m.end(0)]
                 weight = WEIGHT_MAP[weight_str]
                 variant_str = variant_str.replace(weight_str, '')
 
             # Parse style from string and remove the match from the string
-            style_re = re.compile('({})'.format(
-                '|'.join(key for key, _ in STYLE_MAP.items())
-            ))
-            m = style_re.search(variant_str)
+            m = STYLE_RE.search(variant_str)
             if m is not None:
                 style_str = variant_str[m.start(0):m.end(0)]
                 style = STYLE_MAP[style_str]
                 variant_str = variant_str.replace(style_str, '')
 
             # Parse stretch from string and remove the match from the string
-            stretch_re = re.compile('({})'.format(
-                '|'.join(key for key, _ in STRETCH_MAP.items())
-            ))
-            m = stretch_re.search(variant_str)
+            m = STRETCH_RE.search(variant_str)
             if m is not None:
                 stretch_str = variant_str[m.start(0):m.end(0)]
                 stretch = STRETCH_MAP[stretch_str]
@@ -152,6 +165,22 @@ class FontAttribute:
                              misc=misc,
                              _raw=raw)
 
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def from_css(weight: str, style: str = 'normal', stretch: str = 'normal',
+                 misc: str = '') -> 'FontAttribute':
+        '''Create an attribute from its CSS `font-weight`, `font-style` and
+        `font-stretch` values. Results are memoised like `parse()`.'''
+        return FontAttribute(weight=CSS_WEIGHT_MAP[str(weight)],
+                             style=CSS_STYLE_VALUE_MAP[style],
+                             stretch=CSS_STRETCH_VALUE_MAP[stretch],
+                             misc=misc)
+
+    @staticmethod
+    def parse_many(variant_strs: Iterable[str]) -> List['FontAttribute']:
+        '''Parse a list of variant strings.'''
+        return [FontAttribute.parse(variant_str) for variant_str in variant_strs]
+
 
 #===============================================================================
 # WORD MAPPING
@@ -205,9 +234,29 @@ CSS_STYLE_MAP = {
     'o'          : FONT_STYLE.OBLIQUE
 }
 
+CSS_STYLE_VALUE_MAP = {style.value.css: style for style in FONT_STYLE}
+
+CSS_STRETCH_VALUE_MAP = {stretch.value.css: stretch for stretch in FONT_STRETCH}
+
 STRETCH_MAP = {
     'condensed'  : FONT_STRETCH.CONDENSED,
     'extended'   : FONT_STRETCH.EXPANDED,
     'expanded'   : FONT_STRETCH.EXPANDED,
     'stretch'    : FONT_STRETCH.EXPANDED
-}
\ No newline at end of file
+}
+
+#===============================================================================
+# PATTERNS
+#===============================================================================
+CSS_FORMAT_RE = re.compile(r'\d00.*')
+
+CSS_VARIANT_RE = re.compile(r'(\d{{3}})({styles})?_*({stretch})?_*(.+)?'.format(
+    styles='|'.join(CSS_STYLE_MAP),
+    stretch='|'.join(STRETCH_MAP)
+))
+
+WEIGHT_RE = re.compile('({})'.format('|'.join(WEIGHT_MAP)))
+
+STYLE_RE = re.compile('({})'.format('|'.join(STYLE_MAP)))
+
+STRETCH_RE = re.compile('({})'.format('|'.join(STRETCH_MAP)))
@@ -1,6 +1,6 @@
 '''family.py: Class to manage a font family.'''
 import hashlib
-from typing import List, Union, cast
+from typing import List, Union, Dict, cast
 
 from termcolor import colored
 from fonty.lib.variants import FontAttribute
@@ -12,6 +12,8 @@ FontType = Union[Font, InstalledFont]
 class FontFamily(object):
     '''Class to manage a family of fonts.'''
 
+    __slots__ = ('name', 'fonts')
+
     # Class Properties ------------------------------------------------------- #
     name: str
     fonts: List[FontType]
@@ -31,6 +33,7 @@ class FontFamily(object):
     def get_fonts(self, variants: List[FontAttribute] = None) -> List[FontType]:
         '''Returns the list of fonts in this font family.'''
         if variants:
+            variants = set(variants)
             return [font for font in self.fonts if font.variant in variants]
         return self.fonts
 
@@ -81,19 +84,20 @@ class FontFamily(object):
     def from_font_list(fonts: List[FontType]) -> List['FontFamily']:
         '''Create font family instance(s) from a list of fonts.'''
 
-        family_names = list(set([font.family for font in fonts]))
-
-        families = [
-            FontFamily(name=family, fonts=[f for f in fonts if f.family == family])
-            for family in family_names
-        ]
+        families: Dict[str, FontFamily] = {}
+        for font in fonts:
+            if font.family not in families:
+                families[font.family] = FontFamily(name=font.family, fonts=[])
+            families[font.family].fonts.append(font)
 
-        return families
+        return list(families.values())
 
 
 class RemoteFontFamily(object):
     '''Class to manage a remote font family.'''
 
+    __slots__ = ('name', 'fonts')
+
     # Class Properties ------------------------------------------------------- #
     name: str
     fonts: List[RemoteFont]
@@ -113,6 +117,7 @@ class RemoteFontFamily(object):
     def get_variants(self, variants: List[FontAttribute] = None) -> List[RemoteFont]:
         '''Get fonts of the specified variants.'''
         if variants:
+            variants = set(variants)
             return [font for font in self.fonts if font.variant in variants]
         return self.fonts
 
@@ -1,10 +1,10 @@
 '''font.py: Class to manage individual fonts.'''
 import os
-import codecs
 from typing import Dict, Any, Optional
 
 from fontTools.ttLib import TTFont
 from fonty.lib.variants import FontAttribute
+from fonty.lib.name_table import read_name_records
 from fonty.lib.font_name_ids import FONT_NAMEID_FAMILY, FONT_NAMEID_FAMILY_PREFFERED, \
                                     FONT_NAMEID_VARIANT, FONT_NAMEID_VARIANT_PREFFERED
 from .font_format import FontFormat
@@ -12,11 +12,13 @@ from .font_format import FontFormat
 class Font(object):
     '''Class to manage individual fonts.'''
 
+    __slots__ = ('path_to_font', 'family', 'variant', 'name_table')
+
     # Class Properties ------------------------------------------------------- #
     path_to_font: str
     family: str
     variant: FontAttribute
-    name_table: Optional[Dict[Any, Any]] = None
+    name_table: Optional[Dict[Any, Any]]
 
     # Constructor ------------------------------------------------------------ #
     def __init__(
@@ -26,6 +28,7 @@ class Font(object):
             variant: FontAttribute = None
         ) -> None:
         self.path_to_font = path_to_font
+        self.name_table = None
 
         # Get family name
         self.family = family if family else self.get_family_name()
@@ -63,21 +66,12 @@ class Font(object):
         if not self.path_to_font or not os.path.isfile(self.path_to_font):
             raise Exception
 
-        font = TTFont(file=self.path_to_font)
         if self.name_table is None:
             self.name_table = {}
 
-        # Parse font file and retrieve family name and variant
-        for record in font['name'].names:
-            # Decode bytes
-            if b'\x00' in record.string:
-                data = record.string.decode('utf-16-be')
-            elif b'\xa9' in record.string:
-                data = codecs.decode(record.string, errors='ignore')
-            else:
-                data = codecs.decode(record.string, errors='ignore')
-
-            self.name_table[str(record.nameID)] = data
+        # Read the family and variant names from the font's name table
+        for name_id, data in read_name_records(self.path_to_font):
+            self.name_table[str(name_id)] = data
 
         return self
 
@@ -5,6 +5,8 @@ from .font import Font
 class InstalledFont(Font):
     '''Represents an installed font on the computer.'''
 
+    __slots__ = ('installed_path', 'registry_name')
+
     # Class Properties ------------------------------------------------------- #
     installed_path: str
     registry_name: Optional[str]
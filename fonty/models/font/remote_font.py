@@ -1,20 +1,43 @@
 '''remote_font.py'''
 import os
+import re
+import json
 import shutil
+import hashlib
 from enum import Enum
+from typing import Optional, Tuple
 from urllib.parse import urlparse
 
 import requests
 from . import Font
 from fonty.lib.variants import FontAttribute
 from fonty.lib.constants import TMP_DIR
+from fonty.lib import download_cache, network, atomic_file
+
+#: The size of the chunks that font files are downloaded in.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+#: Matches the first byte position of a `Content-Range` header.
+CONTENT_RANGE_RE = re.compile(r'bytes\s+(\d+)-')
+
+#: Matches the complete length of a `Content-Range` header.
+CONTENT_RANGE_LENGTH_RE = re.compile(r'/(\d+)\s*$')
 
 class RemoteFont(object):
-    '''Represents a remote font.'''
+    '''Represents a remote font.
+
+    If the `size` and `sha256` of the font file are known, downloads are
+    verified against them.
+    '''
+
+    __slots__ = ('remote_path', 'filename', 'family', 'variant', 'size', 'sha256', '_tmp_path')
 
     # Meta Classes ----------------------------------------------------------- #
     class Path:
         '''Represents a font path.'''
+
+        __slots__ = ('path', 'type')
+
         class Type(Enum):
             '''Represents the type of the font path.'''
             LOCAL = 1
@@ -39,12 +62,16 @@ class RemoteFont(object):
             remote_path: 'Path',
             filename: str,
             family: str,
-            variant: FontAttribute
+            variant: FontAttribute,
+            size: int = None,
+            sha256: str = None
         ) -> None:
         self.remote_path = remote_path
         self.filename = filename
         self.family = family
         self.variant = variant
+        self.size = size
+        self.sha256 = sha256
 
         # Parse variant if possible
         if variant is None and remote_path.type == RemoteFont.Path.Type.LOCAL:
@@ -55,8 +82,14 @@ class RemoteFont(object):
         self._tmp_path = None
 
     # Class Methods ---------------------------------------------------------- #
-    def load(self, handler = None):
-        '''Load this remote font and return a Font instance.'''
+    def load(self, handler = None, session: requests.Session = None):
+        '''Load this remote font and return a Font instance.
+
+        HTTP remotes are downloaded with `session` if one is provided, or
+        with the shared HTTP session otherwise. Fonts whose
+        hash is known are copied from the download cache if possible, instead
+        of being downloaded again.
+        '''
         from .font import Font
 
         # Create tmp directory
@@ -65,30 +98,24 @@ class RemoteFont(object):
 
         # If path is a HTTP Remote, download the font
         if self.remote_path.type == RemoteFont.Path.Type.HTTP_REMOTE:
-            request = requests.get(self.remote_path.path, stream=True)
+            path_to_font = self.get_tmp_path()
 
-            if handler:
-                iterator = handler(self, request)
-                next(iterator)
+            # Downloaded files that cannot be verified are revalidated instead.
+            # If they have changed, the response is downloaded.
+            response = None
+            if self.size is None and self.sha256 is None:
+                response = self._revalidate(path_to_font, session)
 
-            total_bytes = b''
-            for bytes_ in request.iter_content(128):
-                if not bytes_: continue
-                total_bytes += bytes_
-                # Send total bytes downloaded to the handler. We use
-                # `request.raw.tell()` instead of `len(bytes_)` to
-                # account for requests with gzip compression.
+            if (response is not None and response.status_code == 304) \
+               or self._is_downloaded(path_to_font) or self._copy_from_cache(path_to_font):
+                # Already downloaded by a previous run that did not finish, or
+                # by a previous run that installed the same font file
                 if handler:
-                    iterator.send(request.raw.tell()) # total bytes received
-
-            if handler:
-                iterator.send(len(total_bytes))
-                iterator.close()
-
-            # Save file to tmp directory
-            path_to_font = os.path.join(TMP_DIR, self.remote_path.filename)
-            with open(path_to_font, 'wb+') as f:
-                f.write(total_bytes)
+                    iterator = handler(self, None)
+                    next(iterator)
+                    iterator.close()
+            else:
+                self._download(path_to_font, handler, session, response)
 
         # If path is a local file, copy to tmp directory
         elif self.remote_path.type == RemoteFont.Path.Type.LOCAL:
@@ -98,7 +125,7 @@ class RemoteFont(object):
                 next(iterator)
 
             if not os.path.isfile(self.remote_path.path): raise Exception
-            path_to_font = os.path.join(TMP_DIR, self.remote_path.filename)
+            path_to_font = self.get_tmp_path()
             shutil.copy(self.remote_path.path, path_to_font)
 
             if handler:
@@ -107,7 +134,338 @@ class RemoteFont(object):
         self._tmp_path = path_to_font
         return Font(path_to_font=path_to_font)
 
+    def _download(
+        self,
+        path_to_font: str,
+        handler = None,
+        session: requests.Session = None,
+        response: requests.Response = None
+    ) -> None:
+        '''Download this font to `path_to_font`, from `response` if one is
+        provided.
+
+        The response is streamed in chunks to a partial file and hashed as it
+        arrives, so the font is never held in memory as a whole. The partial
+        file is only renamed to `path_to_font` once it is complete and verified.
+
+        The validators and length of the response are kept in a journal next
+        to the partial file. If a download is interrupted, the next attempt
+        resumes the partial file with a HTTP Range request, unless the server
+        does not support it or the file has changed, in which case it starts
+        over.
+        '''
+        partial_path = path_to_font + '.part'
+        journal_path = partial_path + '.json'
+
+        journal = RemoteFont._read_journal(journal_path)
+        offset = 0
+        if response is None and journal and journal.get('validator') \
+           and os.path.isfile(partial_path):
+            offset = os.path.getsize(partial_path)
+
+        if offset and offset == journal.get('length'):
+            # The previous attempt stopped after downloading the whole file
+            size, digest = hash_file(partial_path)
+        else:
+            size, digest = self._fetch(
+                partial_path, offset, journal, handler, session, response=response
+            )
+
+        # Verify the downloaded file before moving it into place. A corrupt
+        # partial file cannot be resumed.
+        try:
+            self.verify(size, digest.hexdigest())
+        except FontIntegrityError:
+            RemoteFont._remove_partial(partial_path)
+            raise
+
+        os.replace(partial_path, path_to_font)
+
+        # Keep a copy in the download cache. There is no journal if the
+        # partial file was copied from the cache. The journal is kept with the
+        # downloaded file, so that it can be revalidated before it is reused.
+        journal = RemoteFont._read_journal(journal_path)
+        if journal is not None:
+            download_cache.store(
+                path_to_font,
+                digest.hexdigest(),
+                url=self.remote_path.path,
+                etag=journal.get('etag'),
+                last_modified=journal.get('last_modified')
+            )
+            os.replace(journal_path, path_to_font + '.json')
+        elif os.path.isfile(path_to_font + '.json'):
+            os.unlink(path_to_font + '.json')
+
+    def _fetch(
+        self,
+        partial_path: str,
+        offset: int = 0,
+        journal: dict = None,
+        handler = None,
+        session: requests.Session = None,
+        revalidate: bool = True,
+        response: requests.Response = None
+    ) -> Tuple[int, 'hashlib._Hash']:
+        '''Stream this font to a partial file, resuming it from `offset` if
+        possible. Returns the size and SHA-256 digest of the partial file.
+
+        If this font's URL is in the download cache and `revalidate` is
+        `true`, a conditional request is made, and the cached file is used if
+        it has not changed. If `response` is provided, it is streamed instead
+        of making a new request.
+        '''
+        journal_path = partial_path + '.json'
+
+        cached = None
+        if response is None:
+            headers = {}
+            if offset:
+                headers['Range'] = 'bytes={}-'.format(offset)
+                headers['If-Range'] = journal['validator']
+            elif revalidate:
+                cached = download_cache.find_url(self.remote_path.path)
+                if cached and cached[1]:
+                    headers['If-None-Match'] = cached[1]
+                if cached and cached[2]:
+                    headers['If-Modified-Since'] = cached[2]
+
+            response = (session or network.get_session()).get(
+                self.remote_path.path, headers=headers, stream=True
+            )
+        with response as request:
+            # The partial file cannot be resumed, so start over
+            if request.status_code == 416:
+                RemoteFont._remove_partial(partial_path)
+                return self._fetch(partial_path, handler=handler, session=session)
+
+            # The cached file has not changed
+            if request.status_code == 304:
+                cached_path = download_cache.find(cached[0])
+                if cached_path is None or not copy_file(cached_path, partial_path):
+                    return self._fetch(partial_path, handler=handler, session=session, revalidate=False)
+                if handler:
+                    iterator = handler(self, None)
+                    next(iterator)
+                    iterator.close()
+                return hash_file(partial_path)
+
+            request.raise_for_status()
+
+            # The server sends the whole file if it cannot resume it. Partial
+            # responses that do not start at `offset` cannot be used.
+            range_start = get_range_start(request)
+            if range_start == 0:
+                offset = 0
+            elif range_start != offset:
+                RemoteFont._remove_partial(partial_path)
+                if not offset:
+                    raise requests.HTTPError(
+                        'Unexpected partial response for {}'.format(self.remote_path.path),
+                        response=request
+                    )
+                return self._fetch(partial_path, handler=handler, session=session)
+
+            RemoteFont._write_journal(journal_path, request, offset)
+
+            if handler:
+                iterator = handler(self, request)
+                next(iterator)
+
+            # Hash the bytes that were downloaded by the previous attempt
+            if offset:
+                size, digest = hash_file(partial_path)
+            else:
+                size, digest = 0, hashlib.sha256()
+
+            with open(partial_path, 'ab' if offset else 'wb') as f:
+                for bytes_ in request.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    if not bytes_: continue
+                    f.write(bytes_)
+                    size += len(bytes_)
+                    digest.update(bytes_)
+                    # Send total bytes downloaded to the handler. We use
+                    # `request.raw.tell()` instead of `size` to account for
+                    # requests with gzip compression, plus the bytes that were
+                    # downloaded by the previous attempt.
+                    if handler:
+                        iterator.send(offset + request.raw.tell()) # total bytes received
+
+            if handler:
+                iterator.close()
+
+        return size, digest
+
+    def _is_downloaded(self, path_to_font: str) -> bool:
+        '''Returns `true` if this font has already been downloaded to
+        `path_to_font`, and matches its known size and hash. Files whose size
+        and hash are not known are revalidated with `_revalidate()` instead.
+        '''
+        if not os.path.isfile(path_to_font) or (self.size is None and self.sha256 is None):
+            return False
+
+        size, digest = hash_file(path_to_font)
+        try:
+            self.verify(size, digest.hexdigest())
+        except FontIntegrityError:
+            return False
+        return True
+
+    def _revalidate(
+        self,
+        path_to_font: str,
+        session: requests.Session = None
+    ) -> Optional[requests.Response]:
+        '''Make a conditional request for the file downloaded to
+        `path_to_font`, using the validators in its journal.
+
+        Returns the response if its status is `304 Not Modified`, in which
+        case the file can be reused, or `200 OK`, in which case the response
+        has to be downloaded. Returns `None` otherwise, and for files without
+        validators, which are never reused.
+        '''
+        if not os.path.isfile(path_to_font):
+            return None
+
+        journal = RemoteFont._read_journal(path_to_font + '.json')
+        if not journal:
+            return None
+
+        headers = {}
+        if journal.get('etag'):
+            headers['If-None-Match'] = journal['etag']
+        if journal.get('last_modified'):
+            headers['If-Modified-Since'] = journal['last_modified']
+        if not headers:
+            return None
+
+        response = (session or network.get_session()).get(
+            self.remote_path.path, headers=headers, stream=True
+        )
+        if response.status_code == 200:
+            return response
+        response.close()
+        return response if response.status_code == 304 else None
+
+    def _copy_from_cache(self, path_to_font: str) -> bool:
+        '''Copy this font from the download cache to `path_to_font`. Returns
+        `false` if its hash is not known or it is not cached.
+        '''
+        cached_path = download_cache.find(self.sha256)
+        if cached_path is None:
+            return False
+        return copy_file(cached_path, path_to_font)
+
+    @staticmethod
+    def _read_journal(journal_path: str) -> Optional[dict]:
+        '''Read the journal of a partial download. Returns `None` if it does
+        not exist or cannot be read.
+        '''
+        try:
+            with open(journal_path, encoding='utf-8') as f:
+                return json.loads(f.read())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_journal(journal_path: str, response: requests.Response, offset: int) -> None:
+        '''Write the journal of a partial download.
+
+        Only strong validators are recorded, as weak ones cannot be used to
+        resume downloads. Compressed responses cannot be resumed either, as
+        the partial file holds decompressed bytes. The `ETag` and
+        `Last-Modified` headers are also recorded as they are, so that the
+        download cache can revalidate the file later.
+        '''
+        etag = response.headers.get('ETag')
+        validator = etag if etag and not etag.startswith('W/') \
+                    else response.headers.get('Last-Modified')
+        if response.headers.get('Content-Encoding', 'identity') != 'identity':
+            validator = None
+
+        length = response.headers.get('Content-Length')
+        with open(journal_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'url': response.url,
+                'validator': validator,
+                'length': int(length) + offset if length else None,
+                'etag': etag,
+                'last_modified': response.headers.get('Last-Modified')
+            }, f)
+
+    @staticmethod
+    def _remove_partial(partial_path: str) -> None:
+        '''Remove a partial download and its journal.'''
+        for path in (partial_path, partial_path + '.json'):
+            if os.path.isfile(path):
+                os.unlink(path)
+
+    def get_tmp_path(self) -> str:
+        '''Returns the path that this font is loaded into. Fonts with different
+        paths never share a temporary file, even if their filenames are the same.
+        '''
+        key = hashlib.md5(self.remote_path.path.encode('utf-8')).hexdigest()[:8]
+        return os.path.join(TMP_DIR, '{}-{}'.format(key, self.remote_path.filename))
+
+    def verify(self, size: int, sha256: str) -> None:
+        '''Verify the size and SHA-256 hash of a downloaded copy of this font.
+        Raises `FontIntegrityError` if they do not match the expected values.
+        '''
+        if self.size is not None and size != self.size:
+            raise FontIntegrityError(
+                "'{}' is {} bytes, expected {} bytes".format(self.filename, size, self.size)
+            )
+        if self.sha256 is not None and sha256 != self.sha256.lower():
+            raise FontIntegrityError("'{}' does not match its SHA-256 hash".format(self.filename))
+
     def clear(self) -> None:
         '''Remove temporary files.'''
-        if self._tmp_path and os.path.isfile(self._tmp_path):
-            os.unlink(self._tmp_path)
+        if not self._tmp_path:
+            return
+        for path in (self._tmp_path, self._tmp_path + '.json'):
+            if os.path.isfile(path):
+                os.unlink(path)
+
+
+def hash_file(path: str) -> Tuple[int, 'hashlib._Hash']:
+    '''Returns the size and SHA-256 digest of a file.'''
+    size = 0
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for bytes_ in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b''):
+            size += len(bytes_)
+            digest.update(bytes_)
+    return size, digest
+
+def copy_file(src: str, dst: str) -> bool:
+    '''Copy a file atomically. Returns `false` if `src` could not be copied.'''
+    try:
+        atomic_file.copy_file(src, dst)
+    except OSError:
+        return False
+    return True
+
+def get_range_start(response: requests.Response) -> int:
+    '''Returns the position of the first byte of a response in the requested
+    file. This is 0 unless the response is a partial response.
+    '''
+    if response.status_code != 206:
+        return 0
+    m = CONTENT_RANGE_RE.match(response.headers.get('Content-Range', ''))
+    return int(m.group(1)) if m else -1
+
+def get_total_size(response: requests.Response) -> Optional[int]:
+    '''Returns the size of the whole file of a response, or `None` if it is
+    not known. The size is read from the `Content-Range` header of partial
+    responses.
+    '''
+    if response.status_code == 206:
+        m = CONTENT_RANGE_LENGTH_RE.search(response.headers.get('Content-Range', ''))
+        return int(m.group(1)) if m else None
+    length = response.headers.get('Content-Length')
+    return int(length) if length else None
+
+
+class FontIntegrityError(Exception):
+    '''Exception: Raised when a downloaded font does not match its expected size or hash.'''
+    pass
@@ -1,12 +1,17 @@
 '''manifest.py'''
 import json
 from datetime import datetime
-from typing import List, Union
+from collections import Counter
+from contextlib import contextmanager
+from typing import List, Union, Dict, Iterator, Tuple
 
 from fonty.models.font import FontFamily, InstalledFont
 from fonty.lib.constants import APP_DIR, MANIFEST_PATH, JSON_DUMP_OPTS
-from fonty.lib.list_fonts import get_user_fonts, get_user_fonts_count
+from fonty.lib.list_fonts import get_user_fonts, get_user_font_stats, get_font_dir_signature, \
+                                 scan_fonts
+from fonty.lib.font_cache import FontCache, FontChanges, diff_stats
 from fonty.lib.json_encoder import FontyJSONEncoder
+from fonty.lib.config import CommonConfiguration
 from fonty.lib.variants import FontAttribute
 from fonty.lib import utils
 
@@ -16,9 +21,13 @@ class Manifest:
     # Class Attributes
 
     schema_version: str = "0.1.0"
-    families: List[FontFamily]
     last_modified: datetime
     font_count: int
+    signature: dict
+
+    # The nesting depth of open transactions, and the deferred save call.
+    _transaction_depth: int = 0
+    _pending_save: tuple = None
 
     # Constructor
 
@@ -26,80 +35,178 @@ class Manifest:
         self,
         families: List[FontFamily],
         last_modified: Union[str, datetime] = None,
-        font_count: int = 0
+        font_count: int = 0,
+        signature: dict = None
     ) -> None:
         self.families = families
         self.last_modified = utils.parse_date(last_modified)
         self.font_count = font_count
-
+        self.signature = signature
+
+    # Property Accessors
+
+    @property
+    def families(self) -> List[FontFamily]:
+        '''The font families in this manifest.'''
+        return [self._get_family(key) for key in list(self._families)]
+
+    @families.setter
+    def families(self, families: List[FontFamily]) -> None:
+        # Font families are indexed by their case-folded name, and the variants
+        # of each family are counted so that lookups do not scan the manifest.
+        self._families: Dict[str, FontFamily] = {}
+        self._variants: Dict[str, Counter] = {}
+        for family in families:
+            key = Manifest.get_key(family.name)
+            if key in self._families:
+                self._families[key].fonts.extend(family.fonts)
+            else:
+                self._families[key] = family
+                self._variants[key] = Counter()
+            self._variants[key].update(str(font.variant) for font in family.fonts)
 
     # Class Methods
 
     def add(self, font: InstalledFont) -> int:
         '''Add a font to the manifest.'''
-
-        family_name = font.get_family_name()
+        key = Manifest.get_key(font.family)
 
         # Load existing or create a FontFamily object
-        family = self.get(family_name)
-        family_idx = self.get_index(family_name)
+        family = self._get_family(key)
         if family is None:
-            family = FontFamily(name=family_name, fonts=[])
+            family = FontFamily(name=font.family, fonts=[])
+            self._families[key] = family
+            self._variants[key] = Counter()
 
         # Check if font is already in manifest
-        existing_variants = [str(variant) for variant in family.get_variants()]
-        variant = str(font.get_variant())
-        if variant in existing_variants:
+        variant = str(font.variant)
+        if self._variants[key][variant]:
             return 0
 
         # Add font to FontFamily object
         family.fonts.append(font)
-
-        # Update manifest instance
-        if family_idx is None:
-            self.families.append(family)
-        else:
-            self.families[family_idx] = family
+        self._variants[key][variant] += 1
 
         self.font_count += 1
         return 1
 
     def remove(self, font: InstalledFont) -> int:
         '''Remove a font from the manifest.'''
+        key = Manifest.get_key(font.family)
 
         # Load FontFamily
-        family = self.get(font.family)
-        family_idx = self.get_index(font.family)
-        if family is None:
+        family = self._get_family(key)
+        variant = str(font.variant)
+        if family is None or not self._variants[key][variant]:
             return 0
 
         # Remove font from FontFamily
         font_idx = next((
             i for i, val in enumerate(family.fonts) if val.variant == font.variant
         ), None)
-        if font_idx is None:
-            return 0
         family.fonts.pop(font_idx)
-
-        # Update the instance with the updated FontFamily
-        if family.fonts:
-            self.families[family_idx] = family
-        else:
-            del self.families[family_idx]
+        self._discard_variant(key, variant)
+        self._discard_family(key)
 
         self.font_count -= 1
         return 1
 
     def get(self, name: str) -> FontFamily:
         '''Load a font family from the manifest.'''
-        return next((val for val in self.families if val.name.lower() == name.lower()), None)
+        return self._get_family(Manifest.get_key(name))
+
+    def summary(self) -> List[Tuple[str, int]]:
+        '''Returns a list of `(family_name, font_count)` tuples of all font
+        families, without loading the fonts of lazily loaded families.
+        '''
+        return [
+            (value['name'], len(value['fonts'])) if isinstance(value, dict)
+            else (value.name, len(value.fonts))
+            for value in self._families.values()
+        ]
 
     def get_index(self, name: str) -> int:
         '''Get the index position of the font family in the manifest.'''
-        return next((idx for idx, val in enumerate(self.families) if val.name.lower() == name.lower()), None)
+        key = Manifest.get_key(name)
+        if key not in self._families:
+            return None
+        return next(idx for idx, val in enumerate(self._families) if val == key)
+
+    def has_variant(self, name: str, variant: FontAttribute) -> bool:
+        '''Returns `true` if the font family has a font of this variant.'''
+        variants = self._variants.get(Manifest.get_key(name))
+        return bool(variants and variants[str(variant)])
 
     def save(self, path: str = None) -> None:
-        '''Save the manifest list to disk.'''
+        '''Save the manifest list to disk.
+
+        Inside a `transaction()`, the save is deferred until the transaction
+        is committed.
+        '''
+        if self._transaction_depth:
+            self._pending_save = (path,)
+            return
+        self._write(path)
+
+    @contextmanager
+    def transaction(self, refresh: bool = True) -> Iterator['Manifest']:
+        '''Batch many mutations into a single write.
+
+        Changes made inside the `with` block are kept in memory and the
+        manifest is written once when the block exits. If `refresh` is true,
+        the manifest is also checked for staleness once, before it is written.
+        If the block raises, its changes are discarded and nothing is written.
+
+        Example:
+            with Manifest.load().transaction() as manifest:
+                for font in fonts:
+                    manifest.add(font)
+        '''
+        if not self._transaction_depth:
+            snapshot = self._snapshot()
+
+        self._transaction_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._transaction_depth -= 1
+            if not self._transaction_depth:
+                self._pending_save = None
+                self._rollback(snapshot)
+            raise
+
+        self._transaction_depth -= 1
+        if self._transaction_depth:
+            return
+
+        if refresh:
+            self.refresh()
+
+        path, = self._pending_save if self._pending_save else (None,)
+        self._pending_save = None
+        self._write(path)
+
+    def _snapshot(self) -> tuple:
+        '''Returns the state needed to roll back a transaction.'''
+        return (
+            self.font_count,
+            self.signature,
+            [(key, value, list(value.fonts) if isinstance(value, FontFamily) else None)
+             for key, value in self._families.items()],
+            {key: Counter(variants) for key, variants in self._variants.items()}
+        )
+
+    def _rollback(self, snapshot: tuple) -> None:
+        '''Discard the changes of a failed transaction.'''
+        self.font_count, self.signature, families, self._variants = snapshot
+        self._families = {}
+        for key, value, fonts in families:
+            if fonts is not None:
+                value.fonts = fonts
+            self._families[key] = value
+
+    def _write(self, path: str = None) -> None:
+        '''Write the manifest list to disk.'''
         utils.check_dirs(APP_DIR)
         path = path if path else MANIFEST_PATH
 
@@ -107,7 +214,8 @@ class Manifest:
             'schema_version': self.schema_version,
             'last_modified': datetime.now().isoformat(),
             'font_count': self.font_count,
-            'font_families': self.families
+            'signature': self.signature,
+            'font_families': list(self._families.values()) # Unloaded families are written as-is
         }
 
         # Write to file (manifest.json)
@@ -115,43 +223,202 @@ class Manifest:
             json.dump(data, f, cls=FontyJSONEncoder, **JSON_DUMP_OPTS)
 
     def is_stale(self) -> bool:
-        '''Returns `true` if the total number of fonts in the manifest does not
-           match the total number of fonts in the system.
+        '''Returns `true` if the installed fonts in the system have changed since
+           the manifest was last generated or updated.
+        '''
+        return bool(self.get_changes())
+
+    def get_changes(self) -> FontChanges:
+        '''Returns the font files that were added, modified or removed since the
+        manifest was last generated or updated.
+
+        The manifest's signature records the size, modification time and
+        inode number of every file in the font directory, and is compared
+        against the directory's current stat results. The directory's own
+        modification time is not used as a shortcut, as it does not change
+        when a file is overwritten in place.
+        '''
+        stats = get_user_font_stats()
+
+        # Manifests without a signature cannot be diffed reliably. Treat every
+        # font as changed.
+        files = self.signature.get('files') if self.signature else None
+        if files is None:
+            return FontChanges(
+                added=list(stats),
+                modified=[],
+                removed=[font.path_to_font for family in self.families for font in family.fonts]
+            )
+
+        return diff_stats(files, stats)
+
+    def update(self, changes: FontChanges) -> None:
+        '''Apply a set of font file changes to the manifest.'''
+        stats = get_user_font_stats()
+
+        # Remove fonts that were deleted or modified
+        stale_paths = set(changes.removed + changes.modified)
+        if stale_paths:
+            self._remove_paths(stale_paths)
+
+        # Parse and add new or modified fonts
+        cache = FontCache.load()
+        paths = [path for path in changes.added + changes.modified if path in stats]
+        for path, family, variant in scan_fonts(paths, cache=cache, stats=stats):
+            self.add(InstalledFont(
+                installed_path=path,
+                family=family,
+                variant=FontAttribute.parse(variant) if variant is not None else None
+            ))
+        cache.prune(stats)
+        cache.save()
+
+        self.font_count = len(stats)
+        self.signature = get_font_dir_signature(stats)
+
+    def _remove_paths(self, paths: set) -> int:
+        '''Remove all fonts with a path in `paths`. Returns the number of fonts removed.'''
+        count = 0
+        for key, value in list(self._families.items()):
+            # Avoid loading families that are not affected
+            if isinstance(value, dict) and \
+               not any(font.get('local_path') in paths for font in value['fonts']):
+                continue
+
+            family = self._get_family(key)
+            removed = [font for font in family.fonts if font.path_to_font in paths]
+            if not removed:
+                continue
+            family.fonts = [font for font in family.fonts if font.path_to_font not in paths]
+            for font in removed:
+                self._discard_variant(key, str(font.variant))
+            self._discard_family(key)
+            count += len(removed)
+
+        self.font_count -= count
+        return count
+
+    def _get_family(self, key: str) -> FontFamily:
+        '''Returns a font family by its key, loading it if it was loaded lazily.'''
+        value = self._families.get(key)
+        if not isinstance(value, dict):
+            return value
+
+        family = Manifest.load_family(value)
+        self._families[key] = family
+        self._variants[key] = Counter(str(font.variant) for font in family.fonts)
+        return family
+
+    def _set_records(self, records: List[dict]) -> None:
+        '''Index raw font family records from a manifest file without loading
+        their fonts. Fonts are loaded when the family is first accessed.
+        '''
+        self._families = {}
+        self._variants = {}
+        for record in records:
+            key = Manifest.get_key(record.get('name'))
+            if key in self._families:
+                existing = self._families[key]
+                record = {'name': existing['name'], 'fonts': existing['fonts'] + record['fonts']}
+            else:
+                self._variants[key] = Counter()
+            self._families[key] = record
+            self._variants[key].update(font.get('variant') for font in record['fonts'])
+
+    def _discard_variant(self, key: str, variant: str) -> None:
+        '''Decrement a family's variant count.'''
+        variants = self._variants[key]
+        variants[variant] -= 1
+        if variants[variant] <= 0:
+            del variants[variant]
+
+    def _discard_family(self, key: str) -> None:
+        '''Drop a family from the manifest if it has no fonts left.'''
+        family = self._families.get(key)
+        if family is not None and not family.fonts:
+            del self._families[key]
+            del self._variants[key]
+
+    def refresh(self) -> bool:
+        '''Bring the manifest up to date with the installed fonts in the system.
+
+        Returns `true` if the manifest was changed.
         '''
-        return get_user_fonts_count() != self.font_count
+        changes = self.get_changes()
+        if changes:
+            self.update(changes)
+        return bool(changes)
 
     # Static Methods
 
+    @staticmethod
+    def get_key(name: str) -> str:
+        '''Returns the lookup key of a font family name.'''
+        return name.casefold() if name else ''
+
     @staticmethod
     def load(path: str = None) -> 'Manifest':
-        '''Load the manifest file from disk.'''
+        '''Load the manifest from disk, using the configured manifest backend.'''
+        if CommonConfiguration.manifest_backend == 'sqlite':
+            from fonty.models.sqlite_manifest import SQLiteManifest
+            return SQLiteManifest.load(path)
+        return Manifest.load_from_path(path)
+
+    @staticmethod
+    def load_from_path(path: str = None, lazy: bool = True) -> 'Manifest':
+        '''Load a manifest.json file from disk.
+
+        If `lazy` is true, `FontFamily` and `InstalledFont` instances are only
+        created when a family is accessed.
+        '''
         path = path if path else MANIFEST_PATH
 
         with open(path, encoding='utf-8') as f:
             data = json.loads(f.read())
 
-        # Create FontFamily instances
-        families = []
-        for family in data['font_families']:
-            fonts: List[InstalledFont] = [InstalledFont(
-                installed_path=font.get('local_path'),
-                registry_name=font.get('registryName', None),
-                family=family.get('name'),
-                variant=FontAttribute.parse(font.get('variant'))
-            ) for font in family['fonts']]
-            families.append(FontFamily(name=family.get('name'), fonts=fonts))
-
-        return Manifest(
-            families=families,
+        manifest = Manifest(
+            families=[],
             font_count=data['font_count'],
-            last_modified=data['last_modified']
+            last_modified=data['last_modified'],
+            signature=data.get('signature')
         )
 
+        manifest._set_records(data['font_families'])
+        if not lazy:
+            for key in list(manifest._families):
+                manifest._get_family(key)
+
+        return manifest
+
+    @staticmethod
+    def load_family(data: dict) -> FontFamily:
+        '''Create a FontFamily instance from a manifest family record.'''
+        fonts: List[InstalledFont] = [InstalledFont(
+            installed_path=font.get('local_path'),
+            registry_name=font.get('registryName', None),
+            family=data.get('name'),
+            variant=FontAttribute.parse(font.get('variant'))
+        ) for font in data['fonts']]
+        return FontFamily(name=data.get('name'), fonts=fonts)
+
     @staticmethod
-    def generate() -> 'Manifest':
-        '''Generate a manifest list from the user's installed fonts.'''
-        return Manifest(
-            families=get_user_fonts(),
-            font_count=get_user_fonts_count(),
-            last_modified=datetime.now()
+    def generate(workers: int = None, use_cache: bool = True) -> 'Manifest':
+        '''Generate a manifest list from the user's installed fonts.
+
+        Font files are parsed in parallel by `workers` processes. If omitted,
+        the `scan_workers` configuration value is used. Unless `use_cache` is
+        false, only fonts that changed since the last generation are parsed.
+        '''
+        stats = get_user_font_stats()
+
+        manifest = Manifest(
+            families=get_user_fonts(workers=workers, use_cache=use_cache, stats=stats),
+            font_count=len(stats),
+            last_modified=datetime.now(),
+            signature=get_font_dir_signature(stats)
         )
+
+        if CommonConfiguration.manifest_backend == 'sqlite':
+            from fonty.models.sqlite_manifest import SQLiteManifest
+            return SQLiteManifest.from_manifest(manifest)
+        return manifest
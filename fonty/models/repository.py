@@ -1,10 +1,25 @@
 '''repository.py'''
-import json
-from typing import List
+import os
+import pickle
+import hashlib
+from typing import List, Dict, Optional, Union, Any, Callable
 
 from fonty.lib.variants import FontAttribute
+from fonty.lib.constants import SNAPSHOT_DIR
+from fonty.lib import json_stream, atomic_file
 from fonty.models.font import RemoteFontFamily, RemoteFont
 
+#: The version of the snapshot file format. Snapshots of other versions are
+#: ignored, so this must be bumped whenever the record format changes.
+SNAPSHOT_VERSION = 2
+
+#: The repository schemas that can be loaded.
+SCHEMA_IDENTIFIERS = ('fonty_json_schema_v1', 'fonty_json_schema_v2')
+
+#: The members that must precede the typefaces of a `fonty_json_schema_v2`
+#: file for its header index to be used, as the members after them are not read.
+HEADER_FIELDS = ('name', 'schema_identifier', 'family_count', 'index')
+
 class Repository(object):
     '''`Repository` is a class that provides an interface to manage a repository
     and its list of families.
@@ -12,6 +27,11 @@ class Repository(object):
     The `Repository` class does not manage subscriptions. For that, refer to the
     `Subscriptions` model instead.
 
+    Font families are stored as compact `(name, variants, urls, filenames,
+    sizes, sha256s)` records, and are only turned into `RemoteFontFamily`
+    instances when they are accessed. Lazily loaded repositories only store the position of each
+    family in the repository file, and decode it when it is accessed.
+
     Attributes:
         `families` (List[RemoteFontFamily]): Font families available in this repository.
     '''
@@ -22,66 +42,349 @@ class Repository(object):
     #: The name of this repository
     name: str
 
-    #: The font families available in this repository
-    families: List[RemoteFontFamily]
-
     def __init__(
         self,
         name: str,
-        families: List[RemoteFontFamily] = None,
+        families: List[Union[RemoteFontFamily, tuple]] = None,
         schema_identifier: str = None
     ) -> None:
         self.name = name
-        self.families = families
+        self.families = families if families is not None else []
         self.schema_identifier = schema_identifier if schema_identifier else self.schema_identifier
 
+        # The text of the repository file, if families are loaded lazily
+        self._text: Optional[str] = None
+
+        # The name of the family at each position, if the positions were
+        # read from the typeface index of a `fonty_json_schema_v2` header
+        self._names: Optional[List[str]] = None
+
+    # Property Accessors ----------------------------------------------------- #
+    @property
+    def families(self) -> List[RemoteFontFamily]:
+        '''The font families available in this repository.'''
+        return [self._get_family(idx) for idx in range(len(self._families))]
+
+    @families.setter
+    def families(self, families: List[RemoteFontFamily]) -> None:
+        self._set_records(families)
+
+    @property
+    def family_count(self) -> int:
+        '''The number of font families in this repository.'''
+        return len(self._families)
+
+    # Class Methods ---------------------------------------------------------- #
     def get_family(self, name):
         '''Returns a RemoteFontFamily object.'''
-        return next((f for f in self.families if f.name == name), None)
+        idx = self._index.get(name)
+        return self._get_family(idx) if idx is not None else None
+
+    def save_snapshot(self, path: str, digest: str) -> None:
+        '''Save a snapshot of this repository, parsed from a repository file
+        whose digest is `digest`. Snapshots load much faster than repository
+        files, as they are stored in a binary form.
+        '''
+        header = {
+            'version': SNAPSHOT_VERSION,
+            'digest': digest,
+            'schema_identifier': self.schema_identifier
+        }
+        records = [self._get_record(idx) for idx in range(len(self._families))]
+
+        try:
+            with atomic_file.atomic_write(path, 'wb') as f:
+                pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump((self.name, records, self._index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass # Snapshots are only a cache
+
+    def _get_family(self, idx: int) -> RemoteFontFamily:
+        '''Returns the family at a position, creating it from its record if
+        it has not been accessed before.
+        '''
+        family = self._families[idx]
+        if not isinstance(family, RemoteFontFamily):
+            family = Repository._from_record(self._get_record(idx))
+            self._families[idx] = family
+        return family
+
+    def _get_record(self, idx: int) -> tuple:
+        '''Returns the record of the family at a position.'''
+        family = self._families[idx]
+        if isinstance(family, int): # Position in the repository file
+            data = self._decode_at(idx)
+            return Repository.get_family_parser(self.schema_identifier)(data)
+        if isinstance(family, RemoteFontFamily):
+            return Repository._to_record(family)
+        return family
+
+    def _decode_at(self, idx: int) -> dict:
+        '''Decodes the typeface of the family at a position from the
+        repository file.
+
+        Positions read from a `fonty_json_schema_v2` header are only valid for
+        the exact serialisation written by the repository converter. If the
+        typeface cannot be decoded there, or is not the family that the header
+        names, the positions are rebuilt by scanning the file.
+        '''
+        name = self._names[idx] if self._names is not None else None
+        try:
+            data = json_stream.decode_at(self._text, self._families[idx])
+        except ValueError:
+            if name is None:
+                raise
+            data = None
+
+        if name is None or (isinstance(data, dict) and data.get('name') == name):
+            return data
+
+        # The file was reformatted after its index was written
+        self._reindex()
+        if self._families[idx] is None:
+            raise ValueError("Font family '{}' is not in the repository file".format(name))
+        return json_stream.decode_at(self._text, self._families[idx])
+
+    def _reindex(self) -> None:
+        '''Rebuild the positions of lazily loaded families by scanning the
+        repository file. Families keep their position in this repository.
+        '''
+        offsets: Dict[str, int] = {}
+        for key, offset, value in json_stream.iter_members(self._text, array_keys=('typefaces',)):
+            if key == 'typefaces' and isinstance(value, dict):
+                offsets.setdefault(value.get('name'), offset)
+
+        for name, idx in self._index.items():
+            offset = offsets.pop(name, None)
+            if not isinstance(self._families[idx], RemoteFontFamily):
+                self._families[idx] = offset
+
+        # Families that are missing from the header's index
+        for name, offset in offsets.items():
+            self._index[name] = len(self._families)
+            self._families.append(offset)
+
+        self._names = None
+
+    def _set_records(self, records: List[Union[RemoteFontFamily, tuple]]) -> None:
+        '''Set the families of this repository from a list of `RemoteFontFamily`
+        instances or records, and index them by name.
+        '''
+        self._families = list(records)
+        self._index = {}
+        for idx, family in enumerate(self._families):
+            name = family[0] if isinstance(family, tuple) else family.name
+            self._index.setdefault(name, idx)
 
     @staticmethod
-    def load_from_json(json_data):
-        '''Load a repository from a JSON string.'''
-        repo = json_data
-        if not isinstance(json_data, dict):
-            repo = json.loads(json_data)
-        schema_identifier = repo.get('schema_identifier', 'no_schema')
-
-        # Convert all families into `RemoteFontFamily` instances
-        remote_families = []
-
-        # Parse `fonty_json_schema_v1`
-        if schema_identifier == 'fonty_json_schema_v1':
-            for family in repo['typefaces']:
-                remote_families.append(RemoteFontFamily(
-                    name=family['name'],
-                    fonts=[
-                        RemoteFont(
-                            remote_path=RemoteFont.Path(
-                                path=data['url'],
-                                type=RemoteFont.Path.Type.HTTP_REMOTE
-                            ),
-                            filename=data['filename'],
-                            family=family['name'],
-                            variant=FontAttribute.parse(variant)
-                        ) for variant, data in family['fonts'].items()
-                    ]
-                ))
+    def load_from_json(json_data, lazy: bool = False):
+        '''Load a repository from a JSON string.
 
-        # Unknown schema
+        The `typefaces` array is decoded one family at a time, and each family
+        is converted into a compact record as soon as it is decoded, so the
+        decoded typefaces are never held in memory all at once. The text of
+        the document is held in memory while it is read. If `lazy` is true,
+        only the position and name of each family is kept, and families are
+        decoded from the text, which is kept, when they are accessed.
+        '''
+        if isinstance(json_data, dict):
+            text = None
+            members = ((key, None, value) for key, value in json_data.items())
         else:
+            text = json_stream.decode_text(json_data)
+            members = json_stream.iter_members(text, array_keys=('typefaces',))
+
+        fields: Dict[str, Any] = {}
+        families: list = []
+        index: Dict[str, int] = {}
+        names: Optional[List[str]] = None
+
+        for key, offset, value in members:
+            if key != 'typefaces':
+                fields[key] = value
+                continue
+
+            # The header of `fonty_json_schema_v2` files indexes the position
+            # of each typeface, so lazy loads do not need to scan them
+            if lazy and text is not None and not families and Repository._has_index(fields):
+                families = sorted(offset + position for position in fields['index'].values())
+                positions = {family: idx for idx, family in enumerate(families)}
+                index = {
+                    name: positions[offset + position]
+                    for name, position in fields['index'].items()
+                }
+                names = [None] * len(families)
+                for name, idx in index.items():
+                    names[idx] = name
+                break
+
+            # Streamed documents yield one typeface at a time. Typefaces are
+            # converted into records straight away if the schema is already
+            # known, so that the decoded typefaces do not pile up in memory.
+            parse_family = Repository.get_family_parser(fields.get('schema_identifier'))
+            typefaces = value if text is None else [value]
+            for typeface in typefaces:
+                if isinstance(typeface, dict):
+                    index.setdefault(typeface.get('name'), len(families))
+                if lazy and text is not None:
+                    families.append(offset)
+                elif parse_family is not None:
+                    families.append(parse_family(typeface))
+                else:
+                    families.append(typeface)
+
+        schema_identifier = fields.get('schema_identifier', 'no_schema')
+        parse_family = Repository.get_family_parser(schema_identifier)
+
+        # Unknown schema
+        if parse_family is None:
             raise Exception("Unknown repository schema '{}'.".format(schema_identifier))
 
-        return Repository(
-            name=repo['name'],
-            families=remote_families,
-            schema_identifier=schema_identifier
-        )
+        families = [
+            parse_family(family) if isinstance(family, dict) else family
+            for family in families
+        ]
+
+        repo = Repository(name=fields['name'], schema_identifier=schema_identifier)
+        repo._families = families # pylint: disable=W0212
+        repo._index = index # pylint: disable=W0212
+        repo._text = text if lazy else None # pylint: disable=W0212
+        repo._names = names # pylint: disable=W0212
+
+        return repo
 
     @staticmethod
-    def load_from_path(path):
-        '''Load a repository from a file.'''
-        with open(path, encoding='utf-8') as f:
+    def load_from_path(path, use_snapshot: bool = True, lazy: bool = False):
+        '''Load a repository from a file.
+
+        Unless `use_snapshot` is false, the parsed repository is cached in a
+        snapshot file, which is used for as long as the repository file's
+        contents stay the same. If `lazy` is true, no snapshot is used, and
+        families are decoded from the file's contents when they are accessed.
+        '''
+        with open(path, 'rb') as f:
             data = f.read()
 
-        return Repository.load_from_json(data)
+        if lazy or not use_snapshot:
+            return Repository.load_from_json(data, lazy=lazy)
+
+        digest = hashlib.sha1(data).hexdigest()
+        snapshot_path = Repository.get_snapshot_path(path)
+
+        repo = Repository.load_snapshot(snapshot_path, digest)
+        if repo is None:
+            repo = Repository.load_from_json(data)
+            repo.save_snapshot(snapshot_path, digest)
+
+        return repo
+
+    @staticmethod
+    def load_snapshot(path: str, digest: str) -> Optional['Repository']:
+        '''Load a repository snapshot. Returns `None` if the snapshot does not
+        exist, is unreadable, or was not created from a repository file with
+        this `digest`.
+        '''
+        try:
+            with open(path, 'rb') as f:
+                header = pickle.load(f)
+                if header.get('version') != SNAPSHOT_VERSION \
+                   or header.get('digest') != digest \
+                   or header.get('schema_identifier') not in SCHEMA_IDENTIFIERS:
+                    return None
+                name, records, index = pickle.load(f)
+        except Exception: # pylint: disable=W0703
+            return None
+
+        repo = Repository(name=name, schema_identifier=header['schema_identifier'])
+        repo._families = records # pylint: disable=W0212
+        repo._index = index # pylint: disable=W0212
+        return repo
+
+    @staticmethod
+    def get_snapshot_path(path: str) -> str:
+        '''Returns the path to the snapshot of a repository file.'''
+        key = hashlib.md5(os.path.abspath(path).encode('utf-8')).hexdigest()
+        return os.path.join(SNAPSHOT_DIR, key + '.pickle')
+
+    @staticmethod
+    def get_family_parser(schema_identifier: str) -> Optional[Callable[[dict], tuple]]:
+        '''Returns the function that converts typefaces of a schema into
+        records, or `None` if the schema is unknown.'''
+        return {
+            'fonty_json_schema_v1': Repository._parse_family,
+            'fonty_json_schema_v2': Repository._parse_family_v2
+        }.get(schema_identifier)
+
+    @staticmethod
+    def _has_index(fields: Dict[str, Any]) -> bool:
+        '''Returns `true` if a repository header has all of the `HEADER_FIELDS`
+        and a complete typeface index.
+        '''
+        index = fields.get('index')
+        return all(field in fields for field in HEADER_FIELDS) \
+            and fields.get('schema_identifier') == 'fonty_json_schema_v2' \
+            and isinstance(index, dict) \
+            and fields.get('family_count') == len(index)
+
+    @staticmethod
+    def _parse_family(data: dict) -> tuple:
+        '''Convert a `fonty_json_schema_v1` typeface into a compact record.'''
+        fonts = data['fonts']
+        return (
+            data['name'],
+            tuple(fonts),
+            tuple(font['url'] for font in fonts.values()),
+            tuple(font['filename'] for font in fonts.values()),
+            None,
+            None
+        )
+
+    @staticmethod
+    def _parse_family_v2(data: dict) -> tuple:
+        '''Convert a `fonty_json_schema_v2` typeface into a compact record.
+        Variants are stored as their CSS values, so they do not need to be parsed.
+        '''
+        fonts = data['fonts']
+        return (
+            data['name'],
+            tuple(
+                (font['weight'], font['style'], font['stretch'], font.get('misc', ''))
+                for font in fonts
+            ),
+            tuple(font['url'] for font in fonts),
+            tuple(font['filename'] for font in fonts),
+            tuple(font.get('size') for font in fonts),
+            tuple(font.get('sha256') for font in fonts)
+        )
+
+    @staticmethod
+    def _to_record(family: RemoteFontFamily) -> tuple:
+        '''Convert a font family into a compact record.'''
+        return (
+            family.name,
+            tuple(str(font.variant) for font in family.fonts),
+            tuple(font.remote_path.path for font in family.fonts),
+            tuple(font.filename for font in family.fonts),
+            tuple(font.size for font in family.fonts),
+            tuple(font.sha256 for font in family.fonts)
+        )
+
+    @staticmethod
+    def _from_record(record: tuple) -> RemoteFontFamily:
+        '''Create a font family from a compact record.'''
+        name, variants, urls, filenames, sizes, sha256s = record
+        sizes = sizes if sizes is not None else (None,) * len(urls)
+        sha256s = sha256s if sha256s is not None else (None,) * len(urls)
+        return RemoteFontFamily(name=name, fonts=[
+            RemoteFont(
+                remote_path=RemoteFont.Path(path=url, type=RemoteFont.Path.Type.HTTP_REMOTE),
+                filename=filename,
+                family=name,
+                variant=FontAttribute.parse(variant) if isinstance(variant, str) \
+                        else FontAttribute.from_css(*variant),
+                size=size,
+                sha256=sha256
+            ) for variant, url, filename, size, sha256 in zip(
+                variants, urls, filenames, sizes, sha256s
+            )
+        ])
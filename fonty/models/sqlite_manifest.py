@@ -0,0 +1,276 @@
+'''sqlite_manifest.py'''
+import os
+import json
+import sqlite3
+from datetime import datetime
+from typing import List, Union, Iterable, Tuple
+
+from fonty.models.font import FontFamily, InstalledFont
+from fonty.models.manifest import Manifest
+from fonty.lib.constants import APP_DIR, MANIFEST_PATH, MANIFEST_DB_PATH
+from fonty.lib.variants import FontAttribute
+from fonty.lib import utils
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS fonts (
+    id INTEGER PRIMARY KEY,
+    family TEXT NOT NULL,
+    family_key TEXT NOT NULL,
+    variant TEXT NOT NULL,
+    local_path TEXT NOT NULL,
+    registry_name TEXT
+);
+CREATE INDEX IF NOT EXISTS fonts_family_variant ON fonts (family_key, variant);
+CREATE INDEX IF NOT EXISTS fonts_local_path ON fonts (local_path);
+'''
+
+#: The first bytes of every SQLite database file.
+SQLITE_HEADER = b'SQLite format 3\x00'
+
+class SQLiteManifest(Manifest):
+    '''SQLiteManifest is a `Manifest` that is stored in a SQLite database.
+
+    Fonts are stored as indexed rows, so adding or removing a font writes a
+    single row, and looking up a family only reads the rows of that family.
+    Changes are written when `save()` is called.
+    '''
+
+    # Constructor
+
+    def __init__( # pylint: disable=W0231
+        self,
+        connection: sqlite3.Connection,
+        last_modified: Union[str, datetime] = None,
+        font_count: int = 0,
+        signature: dict = None
+    ) -> None:
+        self._connection = connection
+        self.last_modified = utils.parse_date(last_modified)
+        self.font_count = font_count
+        self.signature = signature
+
+    # Property Accessors
+
+    @property
+    def families(self) -> List[FontFamily]:
+        '''The font families in this manifest.'''
+        rows = self._connection.execute(
+            'SELECT family, family_key, variant, local_path, registry_name FROM fonts ORDER BY id'
+        )
+        return SQLiteManifest._to_families(rows)
+
+    @families.setter
+    def families(self, families: List[FontFamily]) -> None:
+        self._connection.execute('DELETE FROM fonts')
+        self._connection.executemany(
+            'INSERT INTO fonts (family, family_key, variant, local_path, registry_name) '
+            'VALUES (?, ?, ?, ?, ?)',
+            ((
+                family.name,
+                Manifest.get_key(family.name),
+                str(font.variant),
+                font.path_to_font,
+                getattr(font, 'registry_name', None)
+            ) for family in families for font in family.fonts)
+        )
+
+    # Class Methods
+
+    def add(self, font: InstalledFont) -> int:
+        '''Add a font to the manifest.'''
+        if self.has_variant(font.family, font.variant):
+            return 0
+
+        self._connection.execute(
+            'INSERT INTO fonts (family, family_key, variant, local_path, registry_name) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (
+                font.family,
+                Manifest.get_key(font.family),
+                str(font.variant),
+                font.path_to_font,
+                getattr(font, 'registry_name', None)
+            )
+        )
+
+        self.font_count += 1
+        return 1
+
+    def remove(self, font: InstalledFont) -> int:
+        '''Remove a font from the manifest.'''
+        cursor = self._connection.execute(
+            'DELETE FROM fonts WHERE id = ('
+            'SELECT id FROM fonts WHERE family_key = ? AND variant = ? ORDER BY id LIMIT 1)',
+            (Manifest.get_key(font.family), str(font.variant))
+        )
+        if not cursor.rowcount:
+            return 0
+
+        self.font_count -= 1
+        return 1
+
+    def get(self, name: str) -> FontFamily:
+        '''Load a font family from the manifest.'''
+        rows = self._connection.execute(
+            'SELECT family, family_key, variant, local_path, registry_name FROM fonts '
+            'WHERE family_key = ? ORDER BY id',
+            (Manifest.get_key(name),)
+        )
+        return next(iter(SQLiteManifest._to_families(rows)), None)
+
+    def summary(self) -> List[Tuple[str, int]]:
+        '''Returns a list of `(family_name, font_count)` tuples of all font families.'''
+        return list(self._connection.execute(
+            'SELECT family, COUNT(*) FROM fonts GROUP BY family_key ORDER BY MIN(id)'
+        ))
+
+    def get_index(self, name: str) -> int:
+        '''Get the index position of the font family in the manifest.'''
+        rows = self._connection.execute(
+            'SELECT family_key FROM fonts GROUP BY family_key ORDER BY MIN(id)'
+        )
+        key = Manifest.get_key(name)
+        return next((idx for idx, row in enumerate(rows) if row[0] == key), None)
+
+    def has_variant(self, name: str, variant: FontAttribute) -> bool:
+        '''Returns `true` if the font family has a font of this variant.'''
+        row = self._connection.execute(
+            'SELECT 1 FROM fonts WHERE family_key = ? AND variant = ? LIMIT 1',
+            (Manifest.get_key(name), str(variant))
+        ).fetchone()
+        return row is not None
+
+    def _snapshot(self) -> tuple:
+        '''Returns the state needed to roll back a transaction.'''
+        return (self.font_count, self.signature)
+
+    def _rollback(self, snapshot: tuple) -> None:
+        '''Discard the changes of a failed transaction.'''
+        self._connection.rollback()
+        self.font_count, self.signature = snapshot
+
+    def _write(self, path: str = None) -> None:
+        '''Commit all pending changes and the manifest metadata to the database.'''
+        meta = {
+            'schema_version': self.schema_version,
+            'last_modified': datetime.now().isoformat(),
+            'font_count': self.font_count,
+            'signature': self.signature
+        }
+        self._connection.executemany(
+            'INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)',
+            ((key, json.dumps(value)) for key, value in meta.items())
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        '''Close the database connection. Unsaved changes are discarded.'''
+        self._connection.close()
+
+    def _remove_paths(self, paths: set) -> int:
+        '''Remove all fonts with a path in `paths`. Returns the number of fonts removed.'''
+        count = 0
+        paths = list(paths)
+        for i in range(0, len(paths), 500):
+            chunk = paths[i:i + 500]
+            cursor = self._connection.execute(
+                'DELETE FROM fonts WHERE local_path IN ({})'.format(', '.join('?' * len(chunk))),
+                chunk
+            )
+            count += cursor.rowcount
+
+        self.font_count -= count
+        return count
+
+    # Static Methods
+
+    @staticmethod
+    def connect(path: str = None) -> sqlite3.Connection:
+        '''Open the manifest database, creating its tables if necessary.'''
+        utils.check_dirs(APP_DIR)
+        connection = sqlite3.connect(path if path else MANIFEST_DB_PATH)
+        connection.executescript(SCHEMA)
+        return connection
+
+    @staticmethod
+    def load(path: str = None) -> 'SQLiteManifest':
+        '''Load the manifest database from disk.
+
+        If the database does not exist yet, it is migrated from an existing
+        manifest.json file. Raises `FileNotFoundError` if neither exist.
+
+        If `path` is a manifest.json file rather than a database, it is
+        migrated into a database next to it, with a `.db` extension. If that
+        database already exists, it is loaded instead.
+        '''
+        path = path if path else MANIFEST_DB_PATH
+
+        if os.path.isfile(path) and not SQLiteManifest.is_database(path):
+            json_path, path = path, os.path.splitext(path)[0] + '.db'
+            if not os.path.isfile(path):
+                return SQLiteManifest.migrate(json_path, path)
+
+        if not os.path.isfile(path):
+            return SQLiteManifest.migrate(MANIFEST_PATH, path)
+
+        connection = SQLiteManifest.connect(path)
+        meta = {key: json.loads(value) for key, value in connection.execute(
+            'SELECT key, value FROM meta'
+        )}
+
+        return SQLiteManifest(
+            connection=connection,
+            font_count=meta.get('font_count', 0),
+            last_modified=meta.get('last_modified'),
+            signature=meta.get('signature')
+        )
+
+    @staticmethod
+    def from_manifest(manifest: Manifest, path: str = None) -> 'SQLiteManifest':
+        '''Create a SQLite manifest with the contents of another manifest. The
+        database is overwritten when `save()` is called.
+        '''
+        sqlite_manifest = SQLiteManifest(
+            connection=SQLiteManifest.connect(path),
+            font_count=manifest.font_count,
+            last_modified=manifest.last_modified,
+            signature=manifest.signature
+        )
+        sqlite_manifest.families = manifest.families
+        return sqlite_manifest
+
+    @staticmethod
+    def migrate(json_path: str = None, path: str = None) -> 'SQLiteManifest':
+        '''Migrate a manifest.json file into a new manifest database.'''
+        manifest = Manifest.load_from_path(json_path)
+        sqlite_manifest = SQLiteManifest.from_manifest(manifest, path)
+        sqlite_manifest.save()
+        return sqlite_manifest
+
+    @staticmethod
+    def is_database(path: str) -> bool:
+        '''Returns `true` if the file at `path` is a SQLite database. Empty
+        files are new databases.
+        '''
+        with open(path, 'rb') as f:
+            header = f.read(len(SQLITE_HEADER))
+        return not header or header == SQLITE_HEADER
+
+    @staticmethod
+    def _to_families(rows: Iterable[tuple]) -> List[FontFamily]:
+        '''Group font rows into FontFamily instances.'''
+        families: dict = {}
+        for name, key, variant, local_path, registry_name in rows:
+            if key not in families:
+                families[key] = FontFamily(name=name, fonts=[])
+            families[key].fonts.append(InstalledFont(
+                installed_path=local_path,
+                registry_name=registry_name,
+                family=name,
+                variant=FontAttribute.parse(variant)
+            ))
+        return list(families.values())
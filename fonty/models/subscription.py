@@ -2,16 +2,21 @@
 import os
 import json
 import hashlib
+import threading
 from datetime import datetime
-from typing import List, Tuple, Union, Any, cast
+from typing import List, Tuple, Union, Any, Dict, Optional, cast
 
 import timeago
 import requests
 import dateutil.parser
 from termcolor import colored
+from fonty.lib import network
 from fonty.lib.constants import SUBSCRIPTIONS_PATH, REPOSITORY_DIR, JSON_DUMP_OPTS
 from fonty.models.repository import Repository
 
+#: Serialises writes to the subscriptions list, as sources can be fetched concurrently.
+ENTRIES_LOCK = threading.Lock()
+
 class Subscription:
     '''Subscriptions is a class that provides an interface to manage a subscription.
 
@@ -25,6 +30,10 @@ class Subscription:
         `local_path` (str): Path to local copy of the repository.
         `last_updated` (datetime): Last updated date.
         `repo` (Repository): The repository this subscription contains.
+        `etag` (str): The ETag of the remote copy when it was last synced.
+        `last_modified` (str): The Last-Modified header of the remote copy when
+                               it was last synced.
+        `digest` (str): MD5 hash of the local copy of the repository.
     '''
 
     #: The name of the remote source.
@@ -42,43 +51,91 @@ class Subscription:
     #: The timestamp of when the local copy was last synced with the remote copy.
     last_updated: datetime
 
+    #: The ETag validator of the remote copy that the local copy was saved from.
+    etag: Optional[str]
+
+    #: The Last-Modified validator of the remote copy that the local copy was saved from.
+    last_modified: Optional[str]
+
+    #: The MD5 hash of the local copy.
+    digest: Optional[str]
+
     def __init__(
         self,
         name: str,
         remote_path: str,
         local_path: str = None,
         repo: Repository = None,
-        last_updated: Union[str, datetime] = None
+        last_updated: Union[str, datetime] = None,
+        etag: str = None,
+        last_modified: str = None,
+        digest: str = None
     ) -> None:
         self.name = name
         self.remote_path = remote_path
         self.local_path = local_path
         self.repo = repo
+        self.etag = etag
+        self.last_modified = last_modified
+        self.digest = digest
         self.id_ = hashlib.md5(self.remote_path.encode('utf-8')).hexdigest()
 
+        # A response that has already been fetched from the remote path, so
+        # that `subscribe()` does not have to download it again
+        self._response: Optional[requests.Response] = None
+
         # Parse last updated date
         if isinstance(last_updated, str):
             self.last_updated = dateutil.parser.parse(cast(str, last_updated))
         else:
             self.last_updated = cast(datetime, last_updated)
 
-    def fetch(self, save_to_local: bool = False) -> Tuple['Subscription', bool]:
+    def fetch(
+        self,
+        save_to_local: bool = False,
+        force: bool = False
+    ) -> Tuple['Subscription', bool]:
         '''Update local copy of repository with remote.
 
+        The request is conditional on the validators of the local copy, so an
+        unchanged remote repository is neither downloaded nor parsed, and
+        `self.repo` is left as is. Set `force` to always download it.
+
         Returns a tuple of `(self, has_changes)`
         '''
         # Fetch remote repository
-        request = requests.get(self.remote_path)
-        data = request.content
+        headers = {} if force else self.get_conditional_headers()
+        response = network.get(self.remote_path, headers=headers)
+
+        # Remote repository has not been modified since the last sync
+        if response.status_code == 304:
+            self.last_updated = datetime.now()
+            Subscription.update_entry(self)
+            return self, False
+
+        return self._load_response(response, save_to_local=save_to_local)
+
+    def _load_response(
+        self,
+        response: requests.Response,
+        save_to_local: bool = False,
+        repo: Repository = None
+    ) -> Tuple['Subscription', bool]:
+        '''Update this subscription with a fetched repository response.
+
+        Returns a tuple of `(self, has_changes)`
+        '''
+        data = response.content
 
         # Check if valid Repository schema
-        try:
-            repo = Repository.load_from_json(data)
-        except ValueError:
-            raise NotJSONError('Data not valid JSON') from None
+        if repo is None:
+            try:
+                repo = Repository.load_from_json(data)
+            except ValueError:
+                raise NotJSONError('Data not valid JSON') from None
 
         # Compare MD5 hash
-        local_md5 = self.get_local_md5()
+        local_md5 = self.digest if self.digest else self.get_local_md5()
         remote_md5 = hashlib.md5(data).hexdigest()
         has_changes = True if local_md5 != remote_md5 else False
 
@@ -86,15 +143,35 @@ class Subscription:
         self.repo = repo
         self.last_updated = datetime.now()
 
-        # Replace local copy of repository with latest
+        # Replace local copy of repository with latest. The validators always
+        # describe the local copy, so they are only updated along with it.
         if save_to_local:
-            self.save_to_local(data)
+            if has_changes or not self.local_path or not os.path.isfile(self.local_path):
+                self.save_to_local(data)
+            self.digest = remote_md5
+            self.etag = response.headers.get('ETag')
+            self.last_modified = response.headers.get('Last-Modified')
 
         # Update subscription entry list
         Subscription.update_entry(self)
 
         return self, has_changes
 
+    def get_conditional_headers(self) -> Dict[str, str]:
+        '''Returns the HTTP headers that make a request conditional on the
+        remote repository having changed since the local copy was saved.
+        '''
+        headers: Dict[str, str] = {}
+        if not self.local_path or not os.path.isfile(self.local_path):
+            return headers
+
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+
+        return headers
+
     def save_to_local(self, bytes_: bytes) -> str:
         '''Saves a local copy of the repository. Returns a path to the local file.'''
         # Check if repository directory exists
@@ -111,16 +188,20 @@ class Subscription:
 
         return path
 
-    def get_local_repository(self) -> Repository:
+    def get_local_repository(self, lazy: bool = False) -> Repository:
         '''Gets the local copy of the repository.
 
+        If `lazy` is true, font families are only decoded when they are
+        accessed. Use this when only a few families, or only the repository's
+        name and family count, are needed.
+
         Returns:
             `Repository` A Repository instance of the local repository file.
         '''
         if not self.local_path:
             raise Exception
 
-        return Repository.load_from_path(self.local_path)
+        return Repository.load_from_path(self.local_path, lazy=lazy)
 
     def get_local_md5(self) -> str:
         '''Returns a MD5 hash representation of the local repository file.
@@ -159,7 +240,13 @@ class Subscription:
                 if idx is not None:
                     raise AlreadySubscribedError
 
-        subscription, _ = self.fetch(save_to_local=True)
+        # Reuse the response fetched by `load_from_url()`
+        if self._response is not None:
+            response, self._response = self._response, None
+            subscription, _ = self._load_response(response, save_to_local=True, repo=self.repo)
+            return subscription
+
+        subscription, _ = self.fetch(save_to_local=True, force=True)
         return subscription
 
     def unsubscribe(self) -> None:
@@ -197,13 +284,14 @@ class Subscription:
             '- Last updated: {last_updated}',
         ]
 
-        # Generate details
-        repo = self.get_local_repository()
+        # Generate details. Only the repository's name and family count are
+        # needed, so its families are not decoded.
+        repo = self.get_local_repository(lazy=True)
         name = colored(repo.name, 'cyan') if ansi else repo.name
         url = colored(self.remote_path, attrs=['dark']) if ansi else self.remote_path
         id_ = colored(self.id_, attrs=['dark']) if ansi else self.id_
-        count = colored(str(len(repo.families)), attrs=['dark']) \
-                if ansi else str(len(repo.families))
+        count = colored(str(repo.family_count), attrs=['dark']) \
+                if ansi else str(repo.family_count)
 
         last_updated = timeago.format(self.last_updated)
         last_updated = colored(last_updated, attrs=['dark']) if ansi else last_updated
@@ -231,6 +319,14 @@ class Subscription:
         Args:
             subscription (Subscription): The `Subscription` instance to be updated.
         '''
+        with ENTRIES_LOCK:
+            Subscription._update_entry(subscription)
+
+    @staticmethod
+    def _update_entry(subscription: 'Subscription') -> None:
+        '''Update an entry in the subscriptions list. Must be called with
+        `ENTRIES_LOCK` held.
+        '''
 
         # Get list of subscriptions from subscriptions.json
         data: Any = {}
@@ -258,7 +354,10 @@ class Subscription:
             'name': subscription.name,
             'remote_path': subscription.remote_path,
             'local_path': subscription.local_path,
-            'last_updated': subscription.last_updated.isoformat()
+            'last_updated': subscription.last_updated.isoformat(),
+            'etag': subscription.etag,
+            'last_modified': subscription.last_modified,
+            'digest': subscription.digest
         }
         if idx is not None:
             data['subscriptions'][idx] = subscription_data
@@ -291,24 +390,34 @@ class Subscription:
                 name=sub.get('name', None),
                 remote_path=sub.get('remote_path', None),
                 local_path=sub.get('local_path', None),
-                last_updated=sub.get('last_updated', None)
+                last_updated=sub.get('last_updated', None),
+                etag=sub.get('etag', None),
+                last_modified=sub.get('last_modified', None),
+                digest=sub.get('digest', None)
             ))
 
         return subscriptions
 
     @staticmethod
     def load_from_url(url: str) -> 'Subscription':
-        '''Load a subscription from a repository URL.'''
-        request = requests.get(url)
-        data = request.content
+        '''Load a subscription from a repository URL.
+
+        The fetched repository is kept, so subscribing to the returned
+        subscription does not download it again. Its families are loaded
+        lazily, as they are only accessed one at a time when they are indexed.
+        '''
+        response = network.get(url)
+        data = response.content
 
         # Check if valid Repository schema
         try:
-            repo = Repository.load_from_json(data)
+            repo = Repository.load_from_json(data, lazy=True)
         except ValueError:
             raise NotJSONError('Data not a valid JSON file') from None
 
-        return Subscription(name=repo.name, remote_path=url, repo=repo)
+        subscription = Subscription(name=repo.name, remote_path=url, repo=repo)
+        subscription._response = response # pylint: disable=W0212
+        return subscription
 
     @staticmethod
     def get(id_: str) -> 'Subscription':
@@ -3,16 +3,17 @@ import os
 import json
 import shutil
 import timeit
-from typing import List
+from typing import List, Dict
 
 import click
 from termcolor import colored
 from fonty.lib.constants import APP_DIR, ROOT_DIR, COLOR_INPUT, CONFIG_FILENAME
-from fonty.lib.task import Task
+from fonty.lib.task import Task, TaskStatus
 from fonty.lib import search
 from fonty.lib.telemetry import TelemetryEvent, TelemetryEventTypes
 from fonty.models.subscription import Subscription, AlreadySubscribedError
 from fonty.models.manifest import Manifest
+from fonty.models.repository import Repository
 
 def initial_setup() -> None:
     '''Perform initial fonty setup.'''
@@ -89,6 +90,7 @@ def generate_default_subscriptions() -> None:
         sources = json.loads(f.read())
 
     # Subscribe to each default sources
+    repositories: Dict[str, Repository] = {}
     for source in sources:
         task = Task(
             "Subscribing to default source '{}'...".format(colored(source['name'], COLOR_INPUT))
@@ -100,14 +102,29 @@ def generate_default_subscriptions() -> None:
             sub.subscribe()
         except AlreadySubscribedError:
             sub = sub.get(sub.id_)
-
-        # Index fonts
-        repo = sub.get_local_repository()
-        search.index_fonts(repo, sub.local_path)
+        repositories[sub.id_] = sub.repo
 
         # Done!
         task.complete()
 
+    # Index the fonts of every subscribed source at once
+    task = Task("Indexing fonts...")
+    subscriptions = Subscription.load_entries()
+    count, failures = search.rebuild_index(
+        (repositories.get(sub.id_) or sub.get_local_repository, sub.local_path)
+        for sub in subscriptions
+    )
+    task.complete("Indexed {} font families".format(count))
+
+    names = {sub.local_path: sub.name for sub in subscriptions}
+    for path, e in failures:
+        Task(
+            "Failed to index '{}': {}".format(colored(names.get(path, path), COLOR_INPUT), e),
+            status=TaskStatus.ERROR,
+            asynchronous=False,
+            truncate=False
+        )
+
 def generate_config() -> None:
     '''Generate default fonty configuration file.'''
     task = Task("Generating default configuration file...")
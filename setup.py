@@ -14,6 +14,7 @@ install_requires = [
     'pypiwin32>=220; platform_system=="Windows"',
     'python-dateutil>=2.6.0',
     'requests>=2.17.3',
+    'urllib3>=1.26.0',
     'Send2Trash>=1.3.0; platform_system=="Darwin"',
     'termcolor>=1.1.0',
     'textwrap3>=0.9.1',
@@ -0,0 +1,50 @@
+'''conftest.py: Shared fixtures for fonty's tests.'''
+import os
+import sys
+import tempfile
+
+import pytest
+from fontTools.fontBuilder import FontBuilder
+from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep fonty's application directory out of the user's home directory. This
+# must happen before fonty is imported, as its paths are resolved on import.
+os.environ['HOME'] = tempfile.mkdtemp(prefix='fonty-tests-')
+
+
+def build_font(path: str, family: str = 'Test Family', style: str = 'Regular',
+               flavor: str = None) -> str:
+    '''Build a minimal TrueType font file at `path`.'''
+    builder = FontBuilder(1000, isTTF=True)
+    builder.setupGlyphOrder(['.notdef'])
+    builder.setupCharacterMap({})
+    builder.setupGlyf({'.notdef': TTGlyphPen(None).glyph()})
+    builder.setupHorizontalMetrics({'.notdef': (500, 0)})
+    builder.setupHorizontalHeader(ascent=800, descent=-200)
+    builder.setupNameTable({'familyName': family, 'styleName': style})
+    builder.setupOS2()
+    builder.setupPost()
+    if flavor:
+        builder.font.flavor = flavor
+    builder.save(path)
+    return path
+
+
+@pytest.fixture
+def font_factory(tmp_path):
+    '''Returns a function that builds font files in a temporary directory.'''
+    def factory(filename: str = 'font.ttf', **kwargs) -> str:
+        return build_font(str(tmp_path / filename), **kwargs)
+    return factory
+
+
+@pytest.fixture
+def font_dir(tmp_path, monkeypatch):
+    '''Use a temporary directory as the user font directory.'''
+    from fonty.lib import list_fonts
+    path = tmp_path / 'Fonts'
+    path.mkdir()
+    monkeypatch.setattr(list_fonts, 'get_user_font_dir', lambda: str(path))
+    return path
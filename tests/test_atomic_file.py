@@ -0,0 +1,28 @@
+'''test_atomic_file.py: Tests for fonty.lib.atomic_file.'''
+import os
+
+import pytest
+
+from fonty.lib import atomic_file
+
+
+def test_save_and_load_json(tmp_path):
+    path = str(tmp_path / 'nested' / 'data.json')
+    atomic_file.save_json(path, 2, {'entries': {'a': [1, 2]}})
+
+    assert atomic_file.load_json(path, 2) == {'schema_version': 2, 'entries': {'a': [1, 2]}}
+    assert atomic_file.load_json(path, 1) is None
+    assert atomic_file.load_json(str(tmp_path / 'missing.json'), 2) is None
+
+
+def test_failed_write_keeps_original_file(tmp_path):
+    path = str(tmp_path / 'data.json')
+    atomic_file.save_json(path, 1, {'value': 'original'})
+
+    with pytest.raises(RuntimeError):
+        with atomic_file.atomic_write(path) as f:
+            f.write('{"partial')
+            raise RuntimeError
+
+    assert atomic_file.load_json(path, 1)['value'] == 'original'
+    assert os.listdir(str(tmp_path)) == ['data.json']
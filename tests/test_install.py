@@ -0,0 +1,35 @@
+'''test_install.py: Tests for fonty.commands.install.'''
+from types import SimpleNamespace
+
+from fonty.commands.install import create_task_printer
+from fonty.lib.variants import FontAttribute
+from fonty.models.font import RemoteFont
+
+
+def make_font(url: str, variant: str, size: int) -> RemoteFont:
+    '''Returns a remote font with a known size.'''
+    return RemoteFont(
+        remote_path=RemoteFont.Path(path=url, type=RemoteFont.Path.Type.HTTP_REMOTE),
+        filename='font.ttf',
+        family='Test Family',
+        variant=FontAttribute.parse(variant),
+        size=size
+    )
+
+
+def test_task_printer_counts_shared_files_once():
+    # Two variants served from the same file are only downloaded once
+    fonts = [
+        make_font('https://example.com/font.ttf', '400', 1000),
+        make_font('https://example.com/font.ttf', '700', 1000),
+    ]
+    task = SimpleNamespace(message='')
+    handler = create_task_printer(task, fonts)
+
+    iterator = handler(fonts[0], None)
+    next(iterator)
+    iterator.send(1000)
+    iterator.close()
+
+    assert '(1/1)' in task.message
+    assert '100%' in task.message
@@ -0,0 +1,37 @@
+'''test_list_fonts.py: Tests for fonty.lib.list_fonts.'''
+import os
+
+from conftest import build_font
+from fonty.lib import list_fonts
+from fonty.lib.font_cache import FontCache
+
+
+def test_scan_fonts_caches_only_parse_failures(font_dir, monkeypatch):
+    font_path = str(font_dir / 'a.ttf')
+    build_font(font_path, family='Alpha')
+    not_font_path = str(font_dir / 'notes.txt')
+    with open(not_font_path, 'w') as f:
+        f.write('Not a font')
+    busy_path = str(font_dir / 'busy.ttf')
+    build_font(busy_path, family='Busy')
+
+    read_family_and_variant = list_fonts.read_family_and_variant
+    def read_or_fail(path):
+        if path == busy_path:
+            raise PermissionError(13, 'Permission denied', path)
+        return read_family_and_variant(path)
+    monkeypatch.setattr(list_fonts, 'read_family_and_variant', read_or_fail)
+
+    cache = FontCache()
+    paths = [font_path, not_font_path, busy_path]
+    entries = list_fonts.scan_fonts(paths, workers=1, cache=cache)
+    assert entries == [(font_path, 'Alpha', 'regular')]
+
+    assert cache.get(font_path, os.stat(font_path)) == ['Alpha', 'regular', True]
+    assert cache.get(not_font_path, os.stat(not_font_path)) == [None, None, False]
+    assert cache.get(busy_path, os.stat(busy_path)) is None
+
+    # The file is read again once it can be opened
+    monkeypatch.setattr(list_fonts, 'read_family_and_variant', read_family_and_variant)
+    entries = list_fonts.scan_fonts(paths, workers=1, cache=cache)
+    assert [entry[1] for entry in entries] == ['Alpha', 'Busy']
@@ -0,0 +1,54 @@
+'''test_manifest.py: Tests for fonty.models.manifest.'''
+import os
+
+from conftest import build_font
+from fonty.models.manifest import Manifest
+
+
+def test_detects_file_overwritten_in_place(font_dir):
+    build_font(str(font_dir / 'a.ttf'), family='Alpha')
+    build_font(str(font_dir / 'b.ttf'), family='Beta')
+    manifest = Manifest.generate(workers=1)
+    assert not manifest.is_stale()
+
+    # Overwriting a file does not change the directory's modification time
+    dir_stat = os.stat(str(font_dir))
+    build_font(str(font_dir / 'b.ttf'), family='Gamma Replacement')
+    os.utime(str(font_dir), ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+
+    assert manifest.is_stale()
+    assert manifest.refresh()
+    assert sorted(family.name for family in manifest.families) == ['Alpha', 'Gamma Replacement']
+    assert not manifest.is_stale()
+
+
+def test_removes_several_fonts_of_one_family(font_dir):
+    build_font(str(font_dir / 'a-regular.ttf'), family='Alpha', style='Regular')
+    build_font(str(font_dir / 'a-bold.ttf'), family='Alpha', style='Bold')
+    build_font(str(font_dir / 'b.ttf'), family='Beta')
+    manifest = Manifest.generate(workers=1)
+    assert len(manifest.get('Alpha').fonts) == 2
+
+    os.remove(str(font_dir / 'a-regular.ttf'))
+    os.remove(str(font_dir / 'a-bold.ttf'))
+
+    assert manifest.refresh()
+    assert manifest.get('Alpha') is None
+    assert not manifest.has_variant('Alpha', manifest.get('Beta').fonts[0].variant)
+    assert [family.name for family in manifest.families] == ['Beta']
+
+
+def test_diffs_against_own_records_not_font_cache(font_dir):
+    build_font(str(font_dir / 'a.ttf'), family='Alpha')
+    Manifest.generate(workers=1)
+
+    # Generating without the cache leaves the cache without the new font
+    build_font(str(font_dir / 'b.ttf'), family='Beta')
+    manifest = Manifest.generate(workers=1, use_cache=False)
+    assert not manifest.is_stale()
+
+    os.remove(str(font_dir / 'a.ttf'))
+    changes = manifest.get_changes()
+    assert (changes.added, changes.modified, changes.removed) == ([], [], [str(font_dir / 'a.ttf')])
+    assert manifest.refresh()
+    assert [family.name for family in manifest.families] == ['Beta']
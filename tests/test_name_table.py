@@ -0,0 +1,42 @@
+'''test_name_table.py: Tests for fonty.lib.name_table.'''
+import pytest
+from fontTools.ttLib import TTLibError
+
+from fonty.lib.name_table import read_family_and_variant
+
+
+def truncate(path: str, size: int) -> None:
+    '''Truncate a file to `size` bytes.'''
+    with open(path, 'r+b') as f:
+        f.truncate(size)
+
+
+@pytest.mark.parametrize('filename,flavor', [('font.ttf', None), ('font.woff', 'woff')])
+def test_read_family_and_variant(font_factory, filename, flavor):
+    path = font_factory(filename, family='Open Sans', style='Bold', flavor=flavor)
+    assert read_family_and_variant(path) == ('Open Sans', 'Bold')
+
+
+@pytest.mark.parametrize('filename,flavor,size', [
+    ('font.ttf', None, 20),     # Inside the sfnt table directory
+    ('font.woff', 'woff', 60),  # Inside the WOFF table directory
+])
+def test_truncated_table_directory(font_factory, filename, flavor, size):
+    path = font_factory(filename, flavor=flavor)
+    truncate(path, size)
+    with pytest.raises(TTLibError):
+        read_family_and_variant(path)
+
+
+def test_truncated_woff_name_table(font_factory):
+    path = font_factory('font.woff', family='A much longer family name ' * 8, flavor='woff')
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    # Cut the file off halfway through the compressed name table
+    index = data.index(b'name', 44)
+    offset = int.from_bytes(data[index + 4:index + 8], 'big')
+    truncate(path, offset + 4)
+
+    with pytest.raises(TTLibError):
+        read_family_and_variant(path)
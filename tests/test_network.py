@@ -0,0 +1,32 @@
+'''test_network.py: Tests for fonty.lib.network.'''
+import pytest
+import requests
+
+from fonty.lib import network
+
+
+@pytest.fixture(autouse=True)
+def sessions():
+    '''Create new sessions for each test.'''
+    network.close_session()
+    yield
+    network.close_session()
+
+
+def test_background_session_does_not_retry():
+    adapter = network.get_background_session().get_adapter('https://example.com')
+    assert adapter.max_retries.total == 0
+    assert adapter.timeout == network.BACKGROUND_TIMEOUT
+    assert network.get_background_session() is not network.get_session()
+
+
+def test_background_request_fails_once(monkeypatch):
+    attempts = []
+    def connect(*args, **kwargs):
+        attempts.append(args[0])
+        raise ConnectionRefusedError()
+    monkeypatch.setattr('urllib3.util.connection.create_connection', connect)
+
+    with pytest.raises(requests.ConnectionError):
+        network.get_background_session().post('http://127.0.0.1:9/telemetry', data='{}')
+    assert len(attempts) == 1
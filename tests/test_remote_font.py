@@ -0,0 +1,211 @@
+'''test_remote_font.py: Tests for downloading fonts with fonty.models.font.RemoteFont.'''
+import os
+import re
+import shutil
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import build_font
+from fonty.lib.config import CommonConfiguration
+from fonty.lib.constants import TMP_DIR
+from fonty.lib.variants import FontAttribute
+from fonty.models.font import RemoteFont
+from fonty.models.font.remote_font import FontIntegrityError
+
+
+class FontServer:
+    '''A HTTP server that serves a single font file. It can cut responses
+    short, ignore range requests, leave out the `Content-Range` header of
+    partial responses, and change the file's ETag.
+    '''
+
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+        self.etag = '"v1"'
+        self.ranges = True
+        self.content_range = True
+        self.cut = None
+        self.requests = []
+
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args): # pylint: disable=W0221
+                pass
+
+            def do_GET(self): # pylint: disable=C0103
+                server.handle(self)
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{}/font.ttf'.format(self.httpd.server_port)
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def handle(self, request: BaseHTTPRequestHandler) -> None:
+        '''Serve the font file.'''
+        headers = request.headers
+        self.requests.append({
+            'range': headers.get('Range'),
+            'if_range': headers.get('If-Range'),
+            'if_none_match': headers.get('If-None-Match')
+        })
+
+        if headers.get('If-None-Match') == self.etag:
+            request.send_response(304)
+            request.send_header('ETag', self.etag)
+            request.end_headers()
+            return
+
+        start = 0
+        range_ = re.match(r'bytes=(\d+)-', headers.get('Range') or '')
+        if range_ and self.ranges and headers.get('If-Range') == self.etag:
+            start = int(range_.group(1))
+            request.send_response(206)
+            if self.content_range:
+                request.send_header('Content-Range', 'bytes {}-{}/{}'.format(
+                    start, len(self.body) - 1, len(self.body)
+                ))
+        else:
+            request.send_response(200)
+        request.send_header('ETag', self.etag)
+        request.send_header('Content-Length', str(len(self.body) - start))
+        request.end_headers()
+
+        data = self.body[start:]
+        if self.cut:
+            request.wfile.write(data[:self.cut])
+            request.wfile.flush()
+            request.close_connection = True
+            request.connection.shutdown(2)
+            return
+        request.wfile.write(data)
+
+    def close(self) -> None:
+        '''Stop the server.'''
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    '''A font server, with an empty temporary directory and no download cache.'''
+    monkeypatch.setattr(CommonConfiguration, 'download_cache_size', 0)
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
+
+    # The body must be larger than a download chunk to be cut short
+    body = open(build_font(str(tmp_path / 'font.ttf')), 'rb').read() + bytes(200 * 1024)
+    server = FontServer(body)
+    yield server
+    server.close()
+
+
+def make_font(server: FontServer, verify: bool = True) -> RemoteFont:
+    '''Returns a remote font served by `server`.'''
+    return RemoteFont(
+        remote_path=RemoteFont.Path(path=server.url, type=RemoteFont.Path.Type.HTTP_REMOTE),
+        filename='font.ttf',
+        family='Test Family',
+        variant=FontAttribute.parse('400'),
+        size=len(server.body) if verify else None,
+        sha256=hashlib.sha256(server.body).hexdigest() if verify else None
+    )
+
+
+def interrupt(server: FontServer, font: RemoteFont) -> int:
+    '''Interrupt a download of `font`. Returns the size of the partial file.'''
+    server.cut = 150 * 1024
+    with pytest.raises(Exception):
+        font.load()
+    server.cut = None
+    server.requests.clear()
+    return os.path.getsize(font.get_tmp_path() + '.part')
+
+
+def read(path: str) -> bytes:
+    '''Returns the contents of a file.'''
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_resumes_interrupted_download(server):
+    font = make_font(server)
+    offset = interrupt(server, font)
+    assert offset > 0
+
+    assert read(font.load().path_to_font) == server.body
+    assert server.requests == [
+        {'range': 'bytes={}-'.format(offset), 'if_range': '"v1"', 'if_none_match': None}
+    ]
+
+
+def test_restarts_download_if_file_changed(server):
+    font = make_font(server, verify=False)
+    interrupt(server, font)
+    server.etag = '"v2"'
+
+    assert read(font.load().path_to_font) == server.body
+    assert server.requests[0]['if_range'] == '"v1"'
+
+
+def test_restarts_download_without_range_support(server):
+    font = make_font(server)
+    interrupt(server, font)
+    server.ranges = False
+
+    assert read(font.load().path_to_font) == server.body
+    assert len(server.requests) == 1
+
+
+def test_corrupt_partial_download_is_removed(server):
+    font = make_font(server)
+    interrupt(server, font)
+    with open(font.get_tmp_path() + '.part', 'r+b') as f:
+        f.write(b'XXXX')
+
+    with pytest.raises(FontIntegrityError):
+        font.load()
+    assert not os.path.exists(font.get_tmp_path() + '.part')
+
+    assert read(font.load().path_to_font) == server.body
+
+
+def test_revalidates_unverified_download(server):
+    font = make_font(server, verify=False)
+    font.load()
+    server.requests.clear()
+
+    # The file has not changed
+    assert read(font.load().path_to_font) == server.body
+    assert server.requests == [{'range': None, 'if_range': None, 'if_none_match': '"v1"'}]
+
+    # The file has changed
+    server.requests.clear()
+    server.etag = '"v2"'
+    server.body = server.body[:-1] + b'\x01'
+    assert read(font.load().path_to_font) == server.body
+    assert server.requests == [{'range': None, 'if_range': None, 'if_none_match': '"v1"'}]
+
+
+def test_restarts_download_without_content_range(server):
+    font = make_font(server)
+    interrupt(server, font)
+    server.content_range = False
+
+    assert read(font.load().path_to_font) == server.body
+    assert [request['range'] for request in server.requests][1:] == [None]
+
+
+def test_progress_includes_resumed_bytes(server):
+    font = make_font(server)
+    offset = interrupt(server, font)
+
+    progress = []
+    def handler(font, response):
+        while True:
+            progress.append((yield))
+
+    font.load(handler)
+    assert offset < progress[0] <= progress[-1] == len(server.body)
@@ -0,0 +1,93 @@
+'''test_repository.py: Tests for fonty.models.repository.'''
+import json
+
+import pytest
+
+from fonty.lib.repository_converter import convert_v1_to_v2
+from fonty.models.repository import Repository
+
+NAMES = ('Alpha', 'Beta Sans', 'Gamma')
+
+
+def make_typeface(name: str) -> dict:
+    '''Returns a `fonty_json_schema_v1` typeface.'''
+    slug = name.lower().replace(' ', '-')
+    return {
+        'name': name,
+        'fonts': {
+            '400': {'url': 'https://example.com/{}.ttf'.format(slug), 'filename': slug + '.ttf'},
+            '700': {'url': 'https://example.com/{}-bold.ttf'.format(slug), 'filename': slug + '-bold.ttf'}
+        }
+    }
+
+
+def make_repository() -> dict:
+    '''Returns a `fonty_json_schema_v1` repository with three families.'''
+    return {
+        'name': 'Test Repository',
+        'schema_identifier': 'fonty_json_schema_v1',
+        'typefaces': [make_typeface(name) for name in NAMES]
+    }
+
+
+@pytest.fixture
+def repository_path(tmp_path):
+    '''A `fonty_json_schema_v1` repository file with three families.'''
+    path = tmp_path / 'repository.json'
+    path.write_text(json.dumps(make_repository(), indent=2))
+    return str(path)
+
+
+def test_lazy_load_matches_eager_load(repository_path):
+    eager = Repository.load_from_path(repository_path, use_snapshot=False)
+    lazy = Repository.load_from_path(repository_path, lazy=True)
+
+    assert lazy.name == eager.name
+    assert lazy.family_count == eager.family_count == 3
+
+    family = lazy.get_family('Beta Sans')
+    assert family.name == 'Beta Sans'
+    assert [font.remote_path.path for font in family.fonts] == \
+           [font.remote_path.path for font in eager.get_family('Beta Sans').fonts]
+
+
+def test_lazy_load_v2_uses_header_index():
+    repo = Repository.load_from_json(convert_v1_to_v2(make_repository()), lazy=True)
+    assert [family.name for family in repo.families] == list(NAMES)
+
+
+def test_lazy_load_reformatted_v2():
+    # Pretty-printing invalidates the positions in the header's index
+    data = json.dumps(json.loads(convert_v1_to_v2(make_repository())), indent=4)
+    repo = Repository.load_from_json(data, lazy=True)
+    assert repo.get_family('Gamma').name == 'Gamma'
+    assert [family.name for family in repo.families] == list(NAMES)
+
+
+def test_lazy_load_v2_with_shifted_positions():
+    # Whitespace inside the first typeface shifts the others, so that the
+    # index points into the wrong typefaces instead of invalid JSON
+    text = convert_v1_to_v2(make_repository())
+    first = text.index('"typefaces":[{') + len('"typefaces":[{')
+    data = json.loads(text)
+    data['index'] = {'Alpha': 0, 'Beta Sans': data['index']['Gamma'], 'Gamma': data['index']['Beta Sans']}
+    header = json.dumps({key: value for key, value in data.items() if key != 'typefaces'},
+                        separators=(',', ':'))
+    text = '{},"typefaces":[{}'.format(header[:-1], text[first - 1:])
+
+    repo = Repository.load_from_json(text, lazy=True)
+    assert repo.get_family('Beta Sans').name == 'Beta Sans'
+    assert repo.get_family('Gamma').name == 'Gamma'
+
+
+def test_lazy_load_v2_with_name_after_typefaces():
+    # The header index is not used, as the name would not be read
+    text = convert_v1_to_v2(make_repository())
+    data = json.loads(text)
+    header = {key: value for key, value in data.items() if key not in ('name', 'typefaces')}
+    typefaces = text[text.index('"typefaces":'):-1]
+    text = '{},{},"name":"Test Repository"}}'.format(json.dumps(header)[:-1], typefaces)
+
+    repo = Repository.load_from_json(text, lazy=True)
+    assert repo.name == 'Test Repository'
+    assert [family.name for family in repo.families] == list(NAMES)
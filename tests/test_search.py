@@ -0,0 +1,80 @@
+'''test_search.py: Tests for fonty.lib.search.'''
+import pytest
+from whoosh.index import open_dir
+
+from fonty.lib import search
+from fonty.lib.constants import SEARCH_INDEX_PATH
+from fonty.models.repository import Repository
+
+
+def make_repository(name: str, families) -> Repository:
+    '''Returns a repository with a font file for each family.'''
+    return Repository.load_from_json({
+        'name': name,
+        'schema_identifier': 'fonty_json_schema_v1',
+        'typefaces': [{
+            'name': family,
+            'fonts': {'400': {'url': 'https://example.com/{}.ttf'.format(family), 'filename': 'a.ttf'}}
+        } for family in families]
+    })
+
+
+def load_corrupt_repository() -> Repository:
+    '''Stands in for a local repository copy that cannot be loaded.'''
+    raise ValueError('Corrupt repository')
+
+
+@pytest.fixture
+def indexed():
+    '''A search index of one repository.'''
+    count, failures = search.rebuild_index(
+        [(make_repository('First', ['Open Sans', 'Lato']), '/first.json')], workers=1
+    )
+    assert (count, failures) == (2, [])
+
+
+def test_rebuild_index_skips_failing_repositories(indexed):
+    count, failures = search.rebuild_index([
+        (load_corrupt_repository, '/corrupt.json'),
+        (lambda: make_repository('Second', ['Roboto']), '/second.json'),
+    ], workers=1)
+
+    assert count == 1
+    assert [(path, str(e)) for path, e in failures] == [('/corrupt.json', 'Corrupt repository')]
+    assert search.search('roboto')[1].name == 'Roboto'
+    with pytest.raises(search.SearchNotFound):
+        search.search('open sans')
+
+
+def test_failed_rebuild_keeps_current_index(indexed):
+    def repositories():
+        yield make_repository('Second', ['Roboto']), '/second.json'
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        search.rebuild_index(repositories(), workers=1)
+
+    assert open_dir(SEARCH_INDEX_PATH).doc_count() == 2
+    assert search.search('open sans')[1].name == 'Open Sans'
+
+
+def test_search_miss_does_not_open_full_text_index(indexed, monkeypatch):
+    def load_index(*args, **kwargs):
+        raise AssertionError('The full-text index was opened')
+    monkeypatch.setattr(search, 'load_index', load_index)
+
+    with pytest.raises(search.SearchNotFound) as excinfo:
+        search.search('open sanz')
+    assert excinfo.value.suggestions[0] == 'Open Sans'
+
+
+def test_failed_index_does_not_update_names(indexed, monkeypatch):
+    def add_document(*args, **kwargs):
+        raise RuntimeError('Failed to index')
+    monkeypatch.setattr(search, 'add_document', add_document)
+
+    with pytest.raises(RuntimeError):
+        search.index_fonts(make_repository('Second', ['Roboto']), '/second.json')
+
+    assert search.find_exact('roboto') is None
+    assert '/second.json' not in search.load_names()
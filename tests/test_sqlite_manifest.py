@@ -0,0 +1,118 @@
+'''test_sqlite_manifest.py: Tests for fonty.models.sqlite_manifest.'''
+import pytest
+
+from fonty.lib.config import CommonConfiguration
+from fonty.lib.variants import FontAttribute
+from fonty.models.font import FontFamily, InstalledFont
+from fonty.models.manifest import Manifest
+from fonty.models.sqlite_manifest import SQLiteManifest
+
+
+def make_font(family: str, variant: str) -> InstalledFont:
+    return InstalledFont(
+        installed_path='/fonts/{}-{}.ttf'.format(family, variant),
+        family=family,
+        variant=FontAttribute.parse(variant)
+    )
+
+
+def make_manifest() -> Manifest:
+    return Manifest(
+        families=[
+            FontFamily(name='Alpha', fonts=[make_font('Alpha', 'regular'), make_font('Alpha', 'bold')]),
+            FontFamily(name='Beta', fonts=[make_font('Beta', 'regular')])
+        ],
+        font_count=3
+    )
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    '''An empty SQLite manifest in a temporary directory.'''
+    manifest = SQLiteManifest.from_manifest(Manifest(families=[]), str(tmp_path / 'manifest.db'))
+    manifest.save()
+    yield manifest
+    manifest.close()
+
+
+def test_migrates_json_manifest(tmp_path):
+    json_path = str(tmp_path / 'manifest.json')
+    db_path = str(tmp_path / 'manifest.db')
+    make_manifest().save(json_path)
+
+    migrated = SQLiteManifest.migrate(json_path, db_path)
+    migrated.close()
+
+    manifest = SQLiteManifest.load(db_path)
+    assert manifest.font_count == 3
+    assert manifest.summary() == [('Alpha', 2), ('Beta', 1)]
+    assert [font.path_to_font for font in manifest.get('alpha').fonts] == \
+           ['/fonts/Alpha-regular.ttf', '/fonts/Alpha-bold.ttf']
+    manifest.close()
+
+
+def test_load_migrates_json_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(CommonConfiguration, 'manifest_backend', 'sqlite')
+    json_path = str(tmp_path / 'manifest.json')
+    make_manifest().save(json_path)
+
+    manifest = Manifest.load(json_path)
+    assert isinstance(manifest, SQLiteManifest)
+    assert manifest.summary() == [('Alpha', 2), ('Beta', 1)]
+    manifest.close()
+    assert (tmp_path / 'manifest.db').is_file()
+
+    # The migrated database is loaded from then on
+    Manifest(families=[]).save(json_path)
+    manifest = Manifest.load(json_path)
+    assert manifest.font_count == 3
+    manifest.close()
+
+
+def test_add_and_remove(manifest, tmp_path):
+    font = make_font('Alpha', 'regular')
+    assert manifest.add(font) == 1
+    assert manifest.add(make_font('Alpha', 'regular')) == 0
+    assert manifest.add(make_font('Alpha', 'bold')) == 1
+    assert manifest.has_variant('ALPHA', FontAttribute.parse('bold'))
+    manifest.save()
+
+    assert manifest.remove(font) == 1
+    assert manifest.remove(font) == 0
+    assert not manifest.has_variant('Alpha', FontAttribute.parse('regular'))
+    manifest.save()
+    manifest.close()
+
+    manifest = SQLiteManifest.load(str(tmp_path / 'manifest.db'))
+    assert manifest.font_count == 1
+    assert [font.variant for font in manifest.get('Alpha').fonts] == [FontAttribute.parse('bold')]
+    manifest.close()
+
+
+def test_transaction_rolls_back_on_error(manifest, tmp_path):
+    manifest.add(make_font('Alpha', 'regular'))
+    manifest.save()
+
+    with pytest.raises(RuntimeError):
+        with manifest.transaction(refresh=False):
+            manifest.add(make_font('Beta', 'regular'))
+            manifest.remove(make_font('Alpha', 'regular'))
+            raise RuntimeError()
+
+    assert manifest.font_count == 1
+    assert manifest.summary() == [('Alpha', 1)]
+    manifest.close()
+
+    manifest = SQLiteManifest.load(str(tmp_path / 'manifest.db'))
+    assert manifest.summary() == [('Alpha', 1)]
+    manifest.close()
+
+
+def test_summary_groups_families_case_insensitively(manifest):
+    manifest.add(make_font('Beta', 'regular'))
+    manifest.add(make_font('Alpha', 'regular'))
+    manifest.add(make_font('ALPHA', 'bold'))
+
+    assert manifest.summary() == [('Beta', 1), ('Alpha', 2)]
+    assert manifest.get_index('alpha') == 1
+    assert manifest.get_index('Gamma') is None